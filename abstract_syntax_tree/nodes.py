@@ -1,7 +1,16 @@
+# Every node also records pos: the source offset of the Tolkien that
+# introduced it (the keyword, operator, bracket or literal; see
+# lexer.SourceMap), or None when it was built without one. Nodes declare
+# __slots__ so that large trees stay small with positions switched on.
+
+
 class Number:
     # Number nodes represent numeric values in the AST.
-    def __init__(self, value):
+    __slots__ = ("value", "pos")
+
+    def __init__(self, value, pos=None):
         self.value = value
+        self.pos = pos
 
     def __repr__(self):
         return f"Number({self.value})"
@@ -9,10 +18,13 @@ class Number:
 
 class BinaryOp:
     # BinaryOp nodes represent binary operations in the AST.
-    def __init__(self, left, op, right):
+    __slots__ = ("left", "op", "right", "pos")
+
+    def __init__(self, left, op, right, pos=None):
         self.left = left
         self.op = op
         self.right = right
+        self.pos = pos
 
     def __repr__(self):
         return f"BinaryOp({self.left}, {self.op}, {self.right})"
@@ -20,8 +32,11 @@ class BinaryOp:
 
 class Boolean:
     # Boolean nodes represent boolean values in the AST.
-    def __init__(self, value):
+    __slots__ = ("value", "pos")
+
+    def __init__(self, value, pos=None):
         self.value = value
+        self.pos = pos
 
     def __repr__(self):
         return f"Boolean({self.value})"
@@ -29,10 +44,13 @@ class Boolean:
 
 class CompareOp:
     # CompareOp nodes represent comparison operations in the AST.
-    def __init__(self, left, op, right):
+    __slots__ = ("left", "op", "right", "pos")
+
+    def __init__(self, left, op, right, pos=None):
         self.left = left
         self.op = op
         self.right = right
+        self.pos = pos
 
     def __repr__(self):
         return f"CompareOp({self.left}, {self.op}, {self.right})"
@@ -40,10 +58,13 @@ class CompareOp:
 
 class LogicalOp:
     # LogicalOp nodes represent logical operations in the AST.
-    def __init__(self, left, op, right):
+    __slots__ = ("left", "op", "right", "pos")
+
+    def __init__(self, left, op, right, pos=None):
         self.left = left
         self.op = op
         self.right = right
+        self.pos = pos
 
     def __repr__(self):
         return f"LogicalOp({self.left}, {self.op}, {self.right})"
@@ -51,9 +72,12 @@ class LogicalOp:
 
 class UnaryOp:
     # UnaryOp nodes represent unary operations in the AST.
-    def __init__(self, op, operand):
+    __slots__ = ("op", "operand", "pos")
+
+    def __init__(self, op, operand, pos=None):
         self.op = op
         self.operand = operand
+        self.pos = pos
 
     def __repr__(self):
         return f"UnaryOp({self.op}, {self.operand})"
@@ -61,8 +85,11 @@ class UnaryOp:
 
 class String:
     # String nodes represent string values in the AST.
-    def __init__(self, value):
+    __slots__ = ("value", "pos")
+
+    def __init__(self, value, pos=None):
         self.value = value
+        self.pos = pos
 
     def __repr__(self):
         return f'String("{self.value}")'
@@ -70,9 +97,12 @@ class String:
 
 class Assign:
     # Assign nodes represent assignment operations in the AST.
-    def __init__(self, var_name, expr):
+    __slots__ = ("var_name", "expr", "pos")
+
+    def __init__(self, var_name, expr, pos=None):
         self.var_name = var_name
         self.expr = expr
+        self.pos = pos
 
     def __repr__(self):
         return f"Assign({self.var_name}, {self.expr})"
@@ -80,8 +110,11 @@ class Assign:
 
 class Var:
     # Var nodes represent variable names in the AST.
-    def __init__(self, var_name):
+    __slots__ = ("var_name", "pos")
+
+    def __init__(self, var_name, pos=None):
         self.var_name = var_name
+        self.pos = pos
 
     def __repr__(self):
         return f"Var({self.var_name})"
@@ -98,10 +131,13 @@ class If:
                      If no else or elif exists, this is None.
     """
 
-    def __init__(self, condition, then_branch, else_branch):
+    __slots__ = ("condition", "then_branch", "else_branch", "pos")
+
+    def __init__(self, condition, then_branch, else_branch, pos=None):
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
+        self.pos = pos
 
     def __repr__(self):
         return f"If({self.condition}, {self.then_branch}, {self.else_branch})"
@@ -116,9 +152,12 @@ class While:
         body: The statement or block that is repeatedly executed while the condition is true.
     """
 
-    def __init__(self, condition, body):
+    __slots__ = ("condition", "body", "pos")
+
+    def __init__(self, condition, body, pos=None):
         self.condition = condition
         self.body = body
+        self.pos = pos
 
     def __repr__(self):
         return f"While({self.condition}, {self.body})"
@@ -126,8 +165,11 @@ class While:
 
 class Print:
     # Print nodes represent print statements in the AST.
-    def __init__(self, expr):
+    __slots__ = ("expr", "pos")
+
+    def __init__(self, expr, pos=None):
         self.expr = expr
+        self.pos = pos
 
     def __repr__(self):
         return f"Print({self.expr})"
@@ -135,8 +177,11 @@ class Print:
 
 class Block:
     # Block nodes represent a sequence of statements in a block.
-    def __init__(self, statements):
+    __slots__ = ("statements", "pos")
+
+    def __init__(self, statements, pos=None):
         self.statements = statements
+        self.pos = pos
 
     def __repr__(self):
         return f"Block({self.statements})"
@@ -151,10 +196,13 @@ class Fun:
         body: A Block node (or similar) containing the function statements.
     """
 
-    def __init__(self, name, params, body):
+    __slots__ = ("name", "params", "body", "pos")
+
+    def __init__(self, name, params, body, pos=None):
         self.name = name
         self.params = params
         self.body = body
+        self.pos = pos
 
     def __repr__(self):
         return f"FunctionDef({self.name}, {self.params}, {self.body})"
@@ -166,11 +214,18 @@ class FunctionCall:
     Attributes:
         func_name: The name of the function being called.
         arguments: A list of expressions to evaluate as arguments.
+        tail: Set by the parser when this is a call of the enclosing
+              function in tail position, which may then reuse the running
+              call instead of starting a new one.
     """
 
-    def __init__(self, func_name, arguments):
+    __slots__ = ("func_name", "arguments", "tail", "pos")
+
+    def __init__(self, func_name, arguments, pos=None):
         self.func_name = func_name
         self.arguments = arguments
+        self.tail = False
+        self.pos = pos
 
     def __repr__(self):
         return f"FunctionCall({self.func_name}, {self.arguments})"
@@ -183,8 +238,111 @@ class Return:
         expr: The expression whose value is returned (or None if no value).
     """
 
-    def __init__(self, expr):
+    __slots__ = ("expr", "pos")
+
+    def __init__(self, expr, pos=None):
         self.expr = expr
+        self.pos = pos
 
     def __repr__(self):
         return f"Return({self.expr})"
+
+
+class ArrayLiteral:
+    """
+    Represents an array literal such as [1, 2.5, x].
+    Attributes:
+        elements: A list of expressions, one per element.
+    """
+
+    __slots__ = ("elements", "pos")
+
+    def __init__(self, elements, pos=None):
+        self.elements = elements
+        self.pos = pos
+
+    def __repr__(self):
+        return f"ArrayLiteral({self.elements})"
+
+
+class Index:
+    """
+    Represents reading one element, e.g. a[i].
+    Attributes:
+        target: The expression being indexed.
+        index: The expression giving the position.
+    """
+
+    __slots__ = ("target", "index", "pos")
+
+    def __init__(self, target, index, pos=None):
+        self.target = target
+        self.index = index
+        self.pos = pos
+
+    def __repr__(self):
+        return f"Index({self.target}, {self.index})"
+
+
+class IndexAssign:
+    """
+    Represents storing into one element, e.g. a[i] = expr.
+    Attributes:
+        target: The expression being indexed.
+        index: The expression giving the position.
+        expr: The value to store.
+    """
+
+    __slots__ = ("target", "index", "expr", "pos")
+
+    def __init__(self, target, index, expr, pos=None):
+        self.target = target
+        self.index = index
+        self.expr = expr
+        self.pos = pos
+
+    def __repr__(self):
+        return f"IndexAssign({self.target}, {self.index}, {self.expr})"
+
+
+class MapLiteral:
+    """
+    Represents a map literal such as {"orcs": 10, "trolls": 2}.
+    Attributes:
+        entries: A list of (key expression, value expression) pairs.
+    """
+
+    __slots__ = ("entries", "pos")
+
+    def __init__(self, entries, pos=None):
+        self.entries = entries
+        self.pos = pos
+
+    def __repr__(self):
+        return f"MapLiteral({self.entries})"
+
+
+class Switch:
+    """
+    A jump table built by the optimizer from an if/elif chain in which every
+    condition compares the same variable with a distinct constant.
+
+    Attributes:
+        var_name: The variable every condition compared.
+        cases: A dict mapping each constant to the branch it selects.
+        default: The branch taken when no constant matches (else block, the
+                 remaining part of the chain, or None).
+        chain: The original If node, run instead when the value is unhashable.
+    """
+
+    __slots__ = ("var_name", "cases", "default", "chain", "pos")
+
+    def __init__(self, var_name, cases, default, chain, pos=None):
+        self.var_name = var_name
+        self.cases = cases
+        self.default = default
+        self.chain = chain
+        self.pos = pos
+
+    def __repr__(self):
+        return f"Switch({self.var_name}, {self.cases}, {self.default})"
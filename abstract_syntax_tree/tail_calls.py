@@ -0,0 +1,37 @@
+from abstract_syntax_tree.nodes import Block, If, Switch, Fun, FunctionCall, Return
+from abstract_syntax_tree.walk import walk
+
+
+def mark_tail_calls(fun):
+    """
+    Mark the calls `fun` makes to itself whose value is returned as is: the
+    expression of any Return, and the value the body ends with. Bodies that
+    define functions are left alone, since the caller's Environment could
+    then hold more than the parameters a tail call rebinds. Marking only
+    sets FunctionCall.tail, so running it again on the same Fun is harmless.
+    """
+    nodes = [child for child, _ in walk([fun.body])]
+    if any(isinstance(child, Fun) for child in nodes):
+        return
+    for child in nodes:
+        if isinstance(child, Return):
+            mark_tail_position(child.expr, fun.name)
+    mark_tail_position(fun.body, fun.name)
+
+
+def mark_tail_position(node, name):
+    # Follow the branches whose value becomes the function's result
+    if isinstance(node, FunctionCall):
+        if node.func_name == name:
+            node.tail = True
+    elif isinstance(node, Block):
+        if node.statements:
+            mark_tail_position(node.statements[-1], name)
+    elif isinstance(node, If):
+        mark_tail_position(node.then_branch, name)
+        mark_tail_position(node.else_branch, name)
+    elif isinstance(node, Switch):
+        for branch in node.cases.values():
+            mark_tail_position(branch, name)
+        mark_tail_position(node.default, name)
+        mark_tail_position(node.chain, name)
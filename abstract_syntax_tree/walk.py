@@ -0,0 +1,40 @@
+from abstract_syntax_tree import nodes
+from abstract_syntax_tree.nodes import Switch
+
+
+def is_node(value):
+    return type(value).__module__ == nodes.__name__
+
+
+def child_nodes(node):
+    """
+    Yield the AST nodes directly below `node`, in source order. Lists,
+    tuples and dicts of nodes (Block statements, MapLiteral entries,
+    Switch cases) are looked through. A Switch yields its cases and default
+    but not the original chain it keeps as a fallback, so shared branches
+    are not visited twice.
+    """
+    if isinstance(node, Switch):
+        fields = (node.cases, node.default)
+    else:
+        fields = [getattr(node, name) for name in type(node).__slots__]
+    stack = list(fields)
+    stack.reverse()
+    while stack:
+        value = stack.pop()
+        if is_node(value):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            stack.extend(reversed(value))
+        elif isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+
+
+def walk(statements):
+    """Yield (node, depth) for every node under a list of top-level statements, depth-first."""
+    stack = [(statement, 1) for statement in reversed(statements)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        children = list(child_nodes(node))
+        stack.extend((child, depth + 1) for child in reversed(children))
@@ -0,0 +1,76 @@
+"""
+Vectorized array operations against the equivalent element-by-element
+MordorLang loops. Pass --no-numpy to measure the array module backend
+when NumPy is installed.
+
+    python benchmarks/arrays.py [elements] [--no-numpy]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "--no-numpy" in sys.argv:
+    sys.argv.remove("--no-numpy")
+    sys.modules["numpy"] = None
+
+from embedding.program import prepare
+from interpreter import values
+from interpreter.interpreter import Environment, Interpreter
+
+SETUP = "a = range(n); b = fill(n, 3);"
+
+CASES = [
+    (
+        "a * 2 + b",
+        "c = a * 2 + b;",
+        "c = fill(n, 0); i = 0; arburz (i < n) { c[i] = a[i] * 2 + b[i]; i = i + 1; };",
+    ),
+    (
+        "a / b",
+        "c = a / b;",
+        "c = fill(n, 0.0); i = 0; arburz (i < n) { c[i] = a[i] / b[i]; i = i + 1; };",
+    ),
+    (
+        "a > b",
+        "c = a > b;",
+        "c = fill(n, false); i = 0; arburz (i < n) { c[i] = a[i] > b[i]; i = i + 1; };",
+    ),
+    (
+        "sum(a)",
+        "s = sum(a);",
+        "s = 0; i = 0; arburz (i < n) { s = s + a[i]; i = i + 1; };",
+    ),
+]
+
+
+def timed(source, n):
+    # Build the inputs and the global Environment first, so neither creating
+    # the arrays nor run()'s copy of them is timed, only the operation itself
+    env = Environment()
+    env.values.update(prepare(SETUP).run(globals={"n": n}).globals)
+    program = prepare(source)
+    interpreter = Interpreter(env=env, output=io.StringIO(), builtins=program.builtins)
+    start = time.perf_counter()
+    interpreter.execute(program.statements)
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    backend = "numpy" if values.numpy is not None else "array module"
+    print(f"{n} elements, {backend} backend")
+    print(f"{'operation':<12}{'loop':>12}{'vectorized':>14}{'M elem/s':>12}{'speedup':>10}")
+    for label, vectorized_source, loop_source in CASES:
+        vectorized = timed(vectorized_source, n)
+        loop = timed(loop_source, n)
+        print(
+            f"{label:<12}{loop:>11.2f}s{vectorized:>13.4f}s"
+            f"{n / vectorized / 1e6:>12.1f}{loop / vectorized:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Event-loop latency while a heavy script runs. A ticker coroutine asks to
+wake every millisecond and records how late each wake-up is. The script is
+run the blocking way (Program.run called from a coroutine) and with
+Program.run_async at several yield intervals. Finally an endless loop is
+stopped by a timeout to show that cancellation is prompt.
+
+    python benchmarks/async_latency.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding.program import prepare
+
+HEAVY = """
+fun collatz(n) {
+    steps = 0;
+    arburz (n != 1) {
+        gul (mod(n, 2) == 0) { n = n / 2; } skai { n = 3 * n + 1; };
+        steps = steps + 1;
+    };
+    zagh steps;
+};
+total = 0;
+i = 1;
+arburz (i < 1500) {
+    total = total + collatz(i);
+    i = i + 1;
+};
+krimp(total);
+"""
+
+ENDLESS = "i = 0; arburz (goth) { i = i + 1; };"
+
+
+async def ticker(lateness, stop, interval=0.001):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lateness.append(time.perf_counter() - expected)
+
+
+async def measure(run):
+    lateness = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lateness, stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    result = await run()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return result, elapsed, sorted(lateness)
+
+
+async def blocking(program):
+    return program.run()
+
+
+def report(name, elapsed, lateness):
+    p99 = lateness[int(len(lateness) * 0.99)] if lateness else 0
+    worst = lateness[-1] if lateness else 0
+    print(f"{name:<22} {elapsed * 1000:9.1f} ms   p99 late {p99 * 1000:8.2f} ms   worst {worst * 1000:8.2f} ms")
+
+
+async def main():
+    program = prepare(HEAVY)
+
+    expected, elapsed, lateness = await measure(lambda: blocking(program))
+    report("blocking run()", elapsed, lateness)
+    for every in (100, 1000, 10000):
+        result, elapsed, lateness = await measure(lambda: program.run_async(yield_every=every))
+        assert result.output == expected.output
+        report(f"run_async({every})", elapsed, lateness)
+
+    endless = prepare(ENDLESS)
+    start = time.perf_counter()
+    try:
+        await endless.run_async(timeout=0.2)
+    except (asyncio.TimeoutError, TimeoutError):
+        print(f"endless loop timed out after {(time.perf_counter() - start) * 1000:.1f} ms (timeout 200 ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
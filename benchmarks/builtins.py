@@ -0,0 +1,65 @@
+"""
+Native builtins against the same functions written as interpreted Fun
+bodies. Each workload calls the function inside a MordorLang loop; times
+are per loop iteration, call included, best of several runs. The bare
+loop is shown for reference: the nearer a native call gets to it, the
+less the call path costs.
+
+    python benchmarks/builtins.py [iterations]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding.program import prepare
+
+INTERPRETED = """
+fun my_abs(v) { gul (v < 0) { zagh -v; }; zagh v; };
+fun my_min(a, b) { gul (a < b) { zagh a; }; zagh b; };
+fun my_max(a, b) { gul (a > b) { zagh a; }; zagh b; };
+fun my_pow(b, e) { r = 1; arburz (e > 0) { r = r * b; e = e - 1; }; zagh r; };
+"""
+
+CASES = [
+    ("abs", "my_abs(i - 500)", "abs(i - 500)"),
+    ("min", "my_min(i, 500)", "min(i, 500)"),
+    ("max", "my_max(i, 500)", "max(i, 500)"),
+    ("pow", "my_pow(2, 10)", "pow(2, 10)"),
+]
+
+LOOP = """
+i = 0;
+arburz (i < n) {{
+    x = {call};
+    i = i + 1;
+}};
+"""
+
+
+def best_of(program, n, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        program.run(globals={"n": n}, output=io.StringIO())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    bare_us = best_of(prepare(LOOP.format(call="i")), n) / n * 1e6
+    print(f"{n} calls per case, us per loop iteration")
+    print(f"{'function':<10}{'interpreted':>14}{'native':>12}{'speedup':>10}")
+    print(f"{'(no call)':<10}{'':>14}{bare_us:>9.2f} us")
+    for name, interpreted_call, native_call in CASES:
+        interpreted_us = best_of(prepare(INTERPRETED + LOOP.format(call=interpreted_call)), n) / n * 1e6
+        native_us = best_of(prepare(LOOP.format(call=native_call)), n) / n * 1e6
+        print(f"{name:<10}{interpreted_us:>11.2f} us{native_us:>9.2f} us{interpreted_us / native_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Overhead of coverage counting on the benchmark workloads: the plain
+Interpreter against CoverageInterpreter, which counts statements,
+branches and loop iterations. Both run the unoptimized tree, as
+--coverage does; times are the best of several runs.
+
+    python benchmarks/coverage.py
+"""
+import glob
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from interpreter.interpreter import Interpreter
+from instrumentation.coverage import Coverage, CoverageInterpreter
+
+
+def best_of(run, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print(f"{'workload':<20} {'plain':>10} {'coverage':>18}")
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, "workloads", "*.mordor"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as file:
+            statements = Parser(Lexer(file.read())).parse()
+
+        plain = best_of(lambda: Interpreter(output=io.StringIO()).execute(statements))
+        # A fresh Coverage per run, as --coverage makes one per program
+        counted = best_of(
+            lambda: CoverageInterpreter(Coverage(statements), output=io.StringIO()).execute(statements)
+        )
+        print(f"{name:<20} {plain * 1000:8.1f}ms {counted * 1000:8.1f}ms ({counted / plain - 1:+5.0%})")
+
+
+if __name__ == "__main__":
+    main()
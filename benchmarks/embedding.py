@@ -0,0 +1,71 @@
+"""
+Per-run cost of the embedding API. Compares re-lexing and re-parsing the
+script on every call with prepare() once / run() many, and with the bare
+execution cost of the already-parsed statements.
+
+    python benchmarks/embedding.py [runs]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from interpreter.interpreter import Environment, Interpreter
+from embedding.program import prepare
+
+SOURCE = """
+total = 0;
+i = 0;
+arburz (i < limit) {
+    total = total + i * rate;
+    i = i + 1;
+};
+gul (total > 100) {
+    krimp("over budget: " + total);
+} skai {
+    krimp("within budget: " + total);
+};
+"""
+
+
+def full_pipeline(bindings):
+    env = Environment()
+    env.values.update(bindings)
+    statements = Parser(Lexer(SOURCE)).parse()
+    Interpreter(env=env, output=io.StringIO()).execute(statements)
+
+
+def bare_execution(statements, bindings):
+    env = Environment()
+    env.values.update(bindings)
+    Interpreter(env=env, output=io.StringIO()).execute(statements)
+
+
+def time_per_run(fn, runs):
+    start = time.perf_counter()
+    for i in range(runs):
+        fn({"limit": 5, "rate": i % 7})
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    program = prepare(SOURCE)
+    statements = list(program.statements)
+
+    rows = [
+        ("lex + parse + run", time_per_run(full_pipeline, runs)),
+        ("prepared run()", time_per_run(lambda g: program.run(globals=g), runs)),
+        ("bare execution", time_per_run(lambda g: bare_execution(statements, g), runs)),
+    ]
+    bare = rows[-1][1]
+    for label, micros in rows:
+        print(f"{label:<20}{micros:>9.1f} us/run  ({micros / bare:.2f}x bare)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Identifier-heavy scripts: lexing throughput when most Tolkiens are names,
+and execution time when most work is variable lookups through nested
+scopes. Lookups are timed twice, once on the tree as parsed (each name one
+interned string shared by every occurrence) and once with every name
+replaced by an equal but separate string, as a lexer without a symbol
+table would leave them.
+
+    python benchmarks/identifiers.py [statements]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lexer import Lexer, tokenize
+from parser.parser import Parser
+from interpreter.interpreter import Interpreter
+from optimizer.optimizer import optimize
+from abstract_syntax_tree.walk import walk
+
+NAMES = [f"uruk_hai_captain_{n}" for n in range(20)]
+
+LOOKUPS = """
+{assignments}
+fun march(steps) {{
+    total = 0;
+    arburz (steps > 0) {{
+        total = total + {sum};
+        steps = steps - 1;
+    }};
+    zagh total;
+}};
+krimp(march(20000));
+"""
+
+
+def dense_source(statements):
+    lines = []
+    for n in range(statements):
+        a, b, c = NAMES[n % 20], NAMES[(n * 7) % 20], NAMES[(n * 13) % 20]
+        lines.append(f"{a} = {b} + {c} * {a} - {b};\n")
+    return "".join(lines)
+
+
+def best_of(build, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def separate_names(statements):
+    # Give every occurrence of a name its own str object
+    for node, _ in walk(statements):
+        for field in ("var_name", "func_name", "name"):
+            value = getattr(node, field, None)
+            if isinstance(value, str):
+                setattr(node, field, "".join(list(value)))
+        if hasattr(node, "params"):
+            node.params = ["".join(list(param)) for param in node.params]
+
+
+def run(statements):
+    Interpreter(output=io.StringIO()).execute(statements)
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    source = dense_source(statements)
+    tolkiens, lex_time = best_of(lambda: tokenize(Lexer(source)))
+    names = sum(1 for t in tolkiens if t.type == "IDENTIFIER")
+    print(f"lex {len(source) / 1024:.0f} KiB, {names} of {len(tolkiens)} Tolkiens are names")
+    print(f"  lexing            {lex_time * 1000:8.1f} ms  {len(tolkiens) / lex_time / 1e6:5.2f} M Tolkiens/s")
+    print(f"  distinct name objects: {len({id(t.value) for t in tolkiens if t.type == 'IDENTIFIER'})}")
+
+    program = LOOKUPS.format(
+        assignments="".join(f"{name} = {i};\n" for i, name in enumerate(NAMES)),
+        sum=" + ".join(NAMES),
+    )
+    shared = optimize(Parser(Lexer(program)).parse())
+    _, shared_time = best_of(lambda: run(shared))
+    separate = optimize(Parser(Lexer(program)).parse())
+    separate_names(separate)
+    _, separate_time = best_of(lambda: run(separate))
+    print("lookups (20000 loop iterations reading 20 globals from 3 scopes down)")
+    print(f"  interned names    {shared_time * 1000:8.1f} ms")
+    print(f"  separate strings  {separate_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Single-character edits on a large file: a full reparse against the
+incremental parser. Edits alternate between replacing a digit (no shift)
+and inserting one (every later position shifts by one), at random places.
+Positions are never shifted; the last two rows are the cost of reading
+the tree after edits and of turning one node's position into a line and
+column, as an error message does.
+
+    python benchmarks/incremental.py [lines] [edits]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from parser.incremental import IncrementalParser
+
+LINES = [
+    "orcs_{i} = {i} * 2 + 7;\n",
+    "gul (orcs_{i} > 10) {{\n",
+    "    krimp(\"orcs: \" + orcs_{i});\n",
+    "}} skai {{\n",
+    "    orcs_{i} = orcs_{i} + 1;\n",
+    "}};\n",
+]
+
+
+def generate(lines):
+    chunk = "".join(LINES)
+    return "".join(chunk.format(i=i) for i in range(lines // len(LINES)))
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    source = generate(lines)
+    digits = [i for i, char in enumerate(source) if char.isdigit()]
+    rng = random.Random(34)
+
+    start = time.perf_counter()
+    Parser(Lexer(source)).parse()
+    full = time.perf_counter() - start
+
+    incremental = IncrementalParser(source)
+    replace_times = []
+    insert_times = []
+    read_times = []
+    locate_times = []
+    for n in range(edits):
+        pos = rng.choice(digits)
+        start = time.perf_counter()
+        if n % 2:
+            incremental.edit(pos, pos, "1")
+            insert_times.append(time.perf_counter() - start)
+            # Shift the digit offsets after the insertion to stay on digits
+            digits = [d + 1 if d >= pos else d for d in digits] + [pos]
+        else:
+            incremental.edit(pos, pos + 1, "3")
+            replace_times.append(time.perf_counter() - start)
+        if n % 20 == 19:
+            start = time.perf_counter()
+            statements = incremental.statements()
+            read_times.append(time.perf_counter() - start)
+            node = statements[rng.randrange(len(statements))]
+            start = time.perf_counter()
+            incremental.source_map.describe(node.pos)
+            locate_times.append(time.perf_counter() - start)
+
+    assert len(incremental.statements()) == len(Parser(Lexer(incremental.source)).parse())
+
+    def ms(times):
+        times = sorted(times)
+        return f"median {times[len(times) // 2] * 1000:8.2f} ms  worst {times[-1] * 1000:8.2f} ms"
+
+    print(f"{source.count(chr(10))} lines, {len(source)} chars, {len(incremental.segments)} statements")
+    print(f"full reparse      {full * 1000:8.1f} ms")
+    print(f"replace a digit   {ms(replace_times)}")
+    print(f"insert a digit    {ms(insert_times)}")
+    print(f"read the tree     {ms(read_times)}")
+    print(f"locate a node     {ms(locate_times)}")
+
+
+if __name__ == "__main__":
+    main()
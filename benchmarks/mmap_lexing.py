@@ -0,0 +1,98 @@
+"""
+Lexing a huge generated script: reading it into a str for Lexer against
+MmapLexer over a memory map of the file. Each path runs in its own
+process so its peak resident memory can be read back; Tolkiens are
+counted and dropped, as a streaming run would.
+
+    python benchmarks/mmap_lexing.py [megabytes]
+
+The default of 500 MB takes several minutes per path; pass a smaller size
+for a quick comparison.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lexer import Lexer
+from lexer.mmap_lexer import MmapLexer
+
+CHUNK = """
+orcs_{i} = {i} * 2 + 7;
+gul (orcs_{i} > 10 agh goth) {{
+    krimp("orcs at the gate: " + orcs_{i});
+}} skai {{
+    names["uruk_{i}"] = orcs_{i} - 1.5;
+}};
+"""
+
+
+def generate(path, megabytes):
+    target = megabytes * 1024 * 1024
+    written = 0
+    i = 0
+    with open(path, "w") as file:
+        while written < target:
+            text = "".join(CHUNK.format(i=i + n) for n in range(1000))
+            file.write(text)
+            written += len(text)
+            i += 1000
+
+
+def drain(lexer):
+    count = 0
+    while lexer.get_next_tolkien().type != "EOF":
+        count += 1
+    return count
+
+
+def child(mode, path):
+    start = time.perf_counter()
+    if mode == "str":
+        with open(path, "r") as file:
+            count = drain(Lexer(file.read()))
+    else:
+        with MmapLexer(path) as lexer:
+            count = drain(lexer)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(count, elapsed, peak)
+
+
+def measure(mode, path):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, path],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    count, elapsed, peak = result.stdout.split()
+    return int(count), float(elapsed), int(peak)
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        return child(sys.argv[2], sys.argv[3])
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "generated.mordor")
+        generate(path, megabytes)
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"{size:.0f} MB generated script")
+        counts = set()
+        for mode, name in (("str", "read() + Lexer"), ("mmap", "MmapLexer")):
+            count, elapsed, peak = measure(mode, path)
+            counts.add(count)
+            print(
+                f"{name:<16} {elapsed:8.1f} s  {size / elapsed:6.2f} MB/s"
+                f"  peak RSS {peak / 1024:8.1f} MB  ({count} Tolkiens)"
+            )
+        assert len(counts) == 1
+
+
+if __name__ == "__main__":
+    main()
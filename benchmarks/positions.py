@@ -0,0 +1,78 @@
+"""
+Lexer and parser throughput and memory with source positions recorded on
+every Tolkien and node. Memory is what the Tolkien list and the finished
+tree keep alive, measured with tracemalloc.
+
+    python benchmarks/positions.py [repeats of the sample program]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lexer import Lexer, TolkienStream, tokenize
+from parser.parser import Parser
+from abstract_syntax_tree.walk import walk
+
+SAMPLE = """
+orcs_{i} = {i} * 2 + (humans - 3) / 4;
+gul (orcs_{i} > 10 agh goth) {{
+    krimp("orcs: " + orcs_{i});
+}} guulnakh (orcs_{i} == 3) {{
+    orcs_{i} = abs(orcs_{i} - 1);
+}} skai {{
+    arburz (orcs_{i} < 5) {{ orcs_{i} = orcs_{i} + 1; }};
+}};
+"""
+
+
+def best_of(build, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def retained(build):
+    # Bytes still allocated by the result of build() once it has returned
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = "humans = 7;\n" + "".join(SAMPLE.format(i=i) for i in range(repeats))
+
+    tolkiens, lex_time = best_of(lambda: tokenize(Lexer(source)))
+    tolkien_count = len(tolkiens)
+    statements, parse_time = best_of(lambda: Parser(TolkienStream(tolkiens)).parse())
+
+    nodes = sum(1 for _ in walk(statements))
+    positioned = sum(1 for node, _ in walk(statements) if getattr(node, "pos", None) is not None)
+
+    tolkiens, tolkien_bytes = retained(lambda: tokenize(Lexer(source)))
+    statements, tree_bytes = retained(lambda: Parser(TolkienStream(tolkiens)).parse())
+    # The usual pipeline, where the tree alone keeps the position offsets alive
+    del tolkiens[:]
+    statements, pipeline_bytes = retained(lambda: Parser(Lexer(source)).parse())
+
+    print(f"{len(source) / 1e6:.1f} MB of source, {tolkien_count} tolkiens, {nodes} nodes")
+    print(f"nodes with a position: {positioned}/{nodes}")
+    print(f"lex     {lex_time:7.3f}s  {tolkien_count / lex_time / 1e3:8.1f} k tolkiens/s  {tolkien_bytes / tolkien_count:6.1f} bytes/tolkien")
+    print(f"parse   {parse_time:7.3f}s  {nodes / parse_time / 1e3:8.1f} k nodes/s     {tree_bytes / nodes:6.1f} bytes/node")
+    print(f"lex + parse together, tree retained: {pipeline_bytes / nodes:6.1f} bytes/node")
+
+
+if __name__ == "__main__":
+    main()
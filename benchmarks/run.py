@@ -0,0 +1,210 @@
+"""
+Benchmark runner for the MordorLang pipeline.
+
+Every workload is timed in three separate phases:
+    lex      Lexer over the source until EOF
+    parse    Parser (and Optimizer) over the already lexed Tolkiens
+    execute  Interpreter over the already parsed statements
+
+Each phase is run `--warmup` times untimed and then `--repeat` times; the
+min/median/mean/stdev are written as JSON. With a baseline file present the
+medians are compared against it and any phase slower by more than
+`--threshold` is reported as a regression (exit status 1).
+
+    python benchmarks/run.py                      # run, compare with baseline
+    python benchmarks/run.py --save-baseline      # run and store as the baseline
+    python benchmarks/run.py -k recursion -r 10   # one workload, more repetitions
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from lexer.lexer import Lexer, TolkienStream, tokenize
+from parser.parser import Parser
+from interpreter.interpreter import Interpreter
+from optimizer.optimizer import optimize
+
+WORKLOAD_DIR = os.path.join(BENCH_DIR, "workloads")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.json")
+PHASES = ("lex", "parse", "execute")
+
+
+# --------------------------
+#     Generated workloads
+# --------------------------
+
+
+def large_flat_script(statements=20000):
+    # A long run of top-level assignments and prints, like machine-generated scripts
+    lines = []
+    for i in range(statements):
+        if i % 10 == 9:
+            lines.append(f'krimp("orcs " + orcs_{i - 1});')
+        else:
+            lines.append(f"orcs_{i} = {i} * 2 + 1;")
+    return "\n".join(lines)
+
+
+def black_speech_script(repeats=400):
+    # Keyword-dense code written entirely with the Black Speech aliases
+    snippet = """
+gul (goth agh burzum urz goth) {
+    krimp("Ash nazg durbatuluk");
+} guulnakh (burzum urz goth agh goth) {
+    krimp("ash nazg gimbatul");
+} skai {
+    krimp("ash nazg thrakatuluk");
+};
+x = 0;
+arburz (x < 1 agh goth) {
+    x = x + 1;
+};
+"""
+    return snippet * repeats
+
+
+def load_workloads():
+    workloads = {}
+    for name in sorted(os.listdir(WORKLOAD_DIR)):
+        if name.endswith(".mordor"):
+            with open(os.path.join(WORKLOAD_DIR, name)) as file:
+                workloads[name[: -len(".mordor")]] = file.read()
+    workloads["large_flat"] = large_flat_script()
+    workloads["black_speech_lexing"] = black_speech_script()
+    return workloads
+
+
+# --------------------------
+#     Timing
+# --------------------------
+
+
+def measure(fn, warmup, repeat):
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.mean(runs),
+        "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        "runs": runs,
+    }
+
+
+def bench_workload(source, warmup, repeat):
+    tolkiens = tokenize(Lexer(source))
+    statements = optimize(Parser(TolkienStream(tolkiens)).parse())
+
+    def lex():
+        tokenize(Lexer(source))
+
+    def parse():
+        optimize(Parser(TolkienStream(tolkiens)).parse())
+
+    def execute():
+        Interpreter(output=io.StringIO()).execute(statements)
+
+    return {
+        "tolkiens": len(tolkiens),
+        "lex": measure(lex, warmup, repeat),
+        "parse": measure(parse, warmup, repeat),
+        "execute": measure(execute, warmup, repeat),
+    }
+
+
+# --------------------------
+#     Reporting
+# --------------------------
+
+
+def compare(results, baseline, threshold):
+    """Return a list of (workload, phase, ratio) whose median got slower than allowed."""
+    regressions = []
+    for name, phases in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if previous is None:
+            continue
+        for phase in PHASES:
+            before = previous[phase]["median"]
+            ratio = phases[phase]["median"] / before if before else 1.0
+            phases[phase]["baseline_ratio"] = ratio
+            if ratio > 1 + threshold:
+                regressions.append((name, phase, ratio))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'workload':<22}" + "".join(f"{phase + ' (ms)':>24}" for phase in PHASES))
+    for name, phases in results["workloads"].items():
+        cells = []
+        for phase in PHASES:
+            stats = phases[phase]
+            cell = f"{stats['median'] * 1000:.2f}±{stats['stdev'] * 1000:.2f}"
+            ratio = stats.get("baseline_ratio")
+            if ratio is not None:
+                cell += f" {ratio:.2f}x"
+            cells.append(f"{cell:>24}")
+        print(f"{name:<22}" + "".join(cells))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Time the MordorLang lex, parse and execute phases.")
+    arg_parser.add_argument("-r", "--repeat", type=int, default=5, help="timed runs per phase")
+    arg_parser.add_argument("-w", "--warmup", type=int, default=1, help="untimed runs per phase")
+    arg_parser.add_argument("-k", "--filter", default="", help="only run workloads whose name contains this")
+    arg_parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = arg_parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "workloads": {},
+    }
+    for name, source in load_workloads().items():
+        if args.filter in name:
+            results["workloads"][name] = bench_workload(source, args.warmup, args.repeat)
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+
+    print_table(results)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --save-baseline to create one.")
+
+    for name, phase, ratio in regressions:
+        print(f"REGRESSION: {name} {phase} is {ratio:.2f}x the baseline median")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
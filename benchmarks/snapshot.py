@@ -0,0 +1,95 @@
+"""
+Startup cost of a long setup prelude: running it from source every time
+against restoring its globals from a snapshot. The prelude defines many
+functions and builds constant tables in loops; the program after it is
+short.
+
+    python benchmarks/snapshot.py [functions] [table size]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lexer import Lexer, SourceMap
+from parser.parser import Parser
+from interpreter.interpreter import Environment, Interpreter
+from optimizer.optimizer import optimize
+from embedding.snapshot import load_snapshot, save_snapshot
+
+FUNCTION = """
+fun rank_{i}(n) {{
+    gul (n < {i}) {{ zagh n * 2; }} guulnakh (n == {i}) {{ zagh 0; }} skai {{ zagh n - {i}; }};
+}};
+"""
+
+TABLES = """
+squares = {{}};
+i = 0;
+arburz (i < {size}) {{
+    squares[i] = i * i;
+    i = i + 1;
+}};
+names = {{}};
+i = 0;
+arburz (i < {size}) {{
+    names["orc" + str(i)] = i;
+    i = i + 1;
+}};
+weights = fill({size}, 0.5);
+"""
+
+PROGRAM = 'krimp(rank_7(squares[12]) + names["orc42"] + weights[3]);'
+
+
+def run_prelude(source):
+    env = Environment()
+    statements = optimize(Parser(Lexer(source)).parse())
+    Interpreter(env=env, output=io.StringIO(), source_map=SourceMap(source)).execute(statements)
+    return env
+
+
+def run_program(env):
+    output = io.StringIO()
+    Interpreter(env=env, output=output).execute(optimize(Parser(Lexer(PROGRAM)).parse()))
+    return output.getvalue()
+
+
+def best_of(build, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    prelude = "".join(FUNCTION.format(i=i) for i in range(functions)) + TABLES.format(size=size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "prelude.snapshot")
+        _, save_time = best_of(lambda: save_snapshot(path, prelude, run_prelude(prelude)), 1)
+        snapshot_size = os.path.getsize(path)
+
+        cold, cold_time = best_of(lambda: run_program(run_prelude(prelude)))
+        warm, warm_time = best_of(lambda: run_program(load_snapshot(path, prelude)))
+        assert cold == warm, (cold, warm)
+
+        _, check_time = best_of(lambda: load_snapshot(path, prelude + " "))
+
+    print(f"prelude: {functions} functions, tables of {size}, {len(prelude)} chars")
+    print(f"snapshot file         {snapshot_size / 1024:8.1f} KiB (written in {save_time * 1000:.1f} ms)")
+    print(f"run prelude + program {cold_time * 1000:8.1f} ms")
+    print(f"restore + program     {warm_time * 1000:8.1f} ms  ({cold_time / warm_time:.1f}x faster)")
+    print(f"reject stale snapshot {check_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
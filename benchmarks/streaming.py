@@ -0,0 +1,71 @@
+"""
+Compare the whole-program path of main.py with --stream on a large,
+flat generated script. Each mode runs in a fresh interpreter process so
+peak RSS is measured independently; time to first output is taken from
+the moment the child is started to the first line on its stdout.
+
+    python benchmarks/streaming.py [statements]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import resource, sys
+sys.path.insert(0, {root!r})
+from main import main
+main({path!r}, stream={stream!r})
+sys.stdout.flush()
+sys.stderr.write(str(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+"""
+
+
+def generate(path, statements):
+    # Mostly assignments with a print every few lines, like our generated scripts
+    with open(path, "w") as file:
+        for i in range(statements):
+            if i % 10 == 9:
+                file.write(f'krimp("orcs " + orcs_{i - 1});\n')
+            else:
+                file.write(f"orcs_{i} = {i} * 2 + 1;\n")
+
+
+def run(path, stream):
+    code = CHILD.format(root=ROOT, path=path, stream=stream)
+    start = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-u", "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    child.stdout.readline()
+    first_output = time.perf_counter() - start
+    child.stdout.read()
+    peak_kb = int(child.stderr.read())
+    child.wait()
+    total = time.perf_counter() - start
+    return first_output, total, peak_kb
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "flat.mordor")
+        generate(path, statements)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{statements} statements, {size_mb:.1f} MB of source")
+        print(f"{'mode':<10}{'first output':>14}{'total':>10}{'peak RSS':>12}")
+        for label, stream in (("batch", False), ("stream", True)):
+            first_output, total, peak_kb = run(path, stream)
+            print(
+                f"{label:<10}{first_output:>13.3f}s{total:>9.2f}s{peak_kb / 1024:>9.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
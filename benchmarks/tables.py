@@ -0,0 +1,59 @@
+"""
+Table-driven lookups three ways: an if/elif chain run as written, the same
+chain turned into a jump table by the optimizer, and a map literal.
+
+    python benchmarks/tables.py [cases] [lookups]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding.program import prepare
+
+LOOP = """
+i = 0;
+arburz (i < n) {{
+    k = mod(i, cases);
+    {lookup}
+    i = i + 1;
+}};
+"""
+
+
+def chain_source(cases):
+    links = [f"gul (k == {c}) {{ r = {c * 10}; }}" if c == 0 else f"guulnakh (k == {c}) {{ r = {c * 10}; }}" for c in range(cases)]
+    return " ".join(links) + " skai { r = -1; };"
+
+
+def map_source(cases):
+    entries = ", ".join(f"{c}: {c * 10}" for c in range(cases))
+    return f"table = {{{entries}}};\n", "r = table[k];"
+
+
+def timed(program, n, cases):
+    start = time.perf_counter()
+    program.run(globals={"n": n, "cases": cases}, output=io.StringIO())
+    return time.perf_counter() - start
+
+
+def main():
+    case_counts = [int(sys.argv[1])] if len(sys.argv) > 1 else [4, 16, 64, 256]
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    print(f"{n} lookups per run")
+    print(f"{'cases':>6}{'if chain':>12}{'jump table':>13}{'map':>10}")
+    for cases in case_counts:
+        chained = prepare(LOOP.format(lookup=chain_source(cases)), optimized=False)
+        switched = prepare(LOOP.format(lookup=chain_source(cases)))
+        setup, lookup = map_source(cases)
+        mapped = prepare(setup + LOOP.format(lookup=lookup))
+        print(
+            f"{cases:>6}{timed(chained, n, cases):>11.3f}s{timed(switched, n, cases):>12.3f}s"
+            f"{timed(mapped, n, cases):>9.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Tail-recursive loops with and without tail-call elimination. With it,
+10^6-deep tail recursion runs in constant stack and memory; with the
+parser's tail marks cleared, the same program hits Python's recursion
+limit long before. Shallow recursion is also timed both ways to compare
+the cost per call.
+
+    python benchmarks/tail_calls.py [depth]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abstract_syntax_tree.nodes import FunctionCall
+from abstract_syntax_tree.walk import walk
+from embedding.program import prepare
+
+LOOP = """
+fun loop(i, acc) {{
+    gul (i == 0) {{ zagh acc; }};
+    zagh loop(i - 1, acc + i);
+}};
+loop({depth}, 0);
+"""
+
+SHALLOW = """
+fun loop(i, acc) {
+    gul (i == 0) { zagh acc; };
+    zagh loop(i - 1, acc + i);
+};
+total = 0;
+n = 0;
+arburz (n < 2000) {
+    total = total + loop(40, 0);
+    n = n + 1;
+};
+total;
+"""
+
+
+def prepared(source, eliminated=True):
+    program = prepare(source)
+    if not eliminated:
+        # Every call becomes a plain call that grows the stack
+        for node, _ in walk(program.statements):
+            if isinstance(node, FunctionCall):
+                node.tail = False
+    return program
+
+
+def run(program, traced=False):
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = program.run().result
+    except RecursionError:
+        result = "RecursionError"
+    elapsed = time.perf_counter() - start
+    peak = None
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"tail recursion {depth} deep")
+    for eliminated in (True, False):
+        result, elapsed, _ = run(prepared(LOOP.format(depth=depth), eliminated))
+        label = "tail calls eliminated" if eliminated else "plain calls"
+        per_call = "" if result == "RecursionError" else f"{elapsed / depth * 1e6:6.2f} us per call"
+        print(f"  {label:<22} {elapsed:8.2f} s  {per_call:>17}  -> {result}")
+
+    # tracemalloc slows every allocation down, so memory is traced on smaller runs
+    print("peak traced memory with tail calls eliminated")
+    for traced_depth in (1_000, 10_000, 100_000):
+        _, _, peak = run(prepared(LOOP.format(depth=traced_depth)), traced=True)
+        print(f"  {traced_depth:>8} deep  {peak / 1024:8.1f} KiB")
+
+    print("2000 x 40-deep recursion")
+    results = set()
+    for eliminated in (True, False):
+        program = prepared(SHALLOW, eliminated)
+        start = time.perf_counter()
+        results.add(program.run().result)
+        elapsed = time.perf_counter() - start
+        label = "tail calls eliminated" if eliminated else "plain calls"
+        print(f"  {label:<22} {elapsed * 1000:8.1f} ms  {elapsed / 82000 * 1e6:6.2f} us per call")
+    assert len(results) == 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Scaling of run_many with the number of worker threads, for a CPU-bound
+script and for one whose output goes to a slow sink (each write waits,
+like a pipe or socket would). CPU-bound work only scales on free-threaded
+builds; the slow-sink case overlaps on any build.
+
+    python benchmarks/threads.py [jobs]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding.program import prepare
+from embedding.pool import GIL_ENABLED, run_many
+
+CPU_BOUND = """
+total = 0;
+i = 0;
+arburz (i < 5000) {
+    total = total + mod(i * seed, 7);
+    i = i + 1;
+};
+krimp(total);
+"""
+
+OUTPUT_BOUND = """
+i = 0;
+arburz (i < 20) {
+    krimp("line " + str(i + seed));
+    i = i + 1;
+};
+"""
+
+
+class SlowSink:
+    # Stands in for a pipe or socket: every write blocks for a while
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.lines = []
+
+    def write(self, text):
+        time.sleep(self.delay)
+        self.lines.append(text)
+
+
+def timed(jobs, workers):
+    start = time.perf_counter()
+    results = run_many(jobs, workers)
+    return results, time.perf_counter() - start
+
+
+def scale(name, make_jobs, expected):
+    print(name)
+    baseline = None
+    for workers in (1, 2, 4, 8):
+        jobs = make_jobs()
+        results, elapsed = timed(jobs, workers)
+        assert expected(jobs, results)
+        baseline = baseline or elapsed
+        print(f"  {workers} workers  {elapsed * 1000:8.1f} ms  {baseline / elapsed:5.2f}x")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    print(f"GIL enabled: {GIL_ENABLED}, {os.cpu_count()} CPUs, {count} jobs")
+
+    cpu = prepare(CPU_BOUND)
+    serial = [cpu.run(globals={"seed": n}).output for n in range(count)]
+    scale(
+        "CPU-bound",
+        lambda: [(cpu, {"seed": n}) for n in range(count)],
+        lambda jobs, results: [r.output for r in results] == serial,
+    )
+
+    output = prepare(OUTPUT_BOUND)
+    scale(
+        "slow output sink",
+        lambda: [(output, {"seed": n}, SlowSink()) for n in range(count)],
+        lambda jobs, results: all(
+            job[2].lines == [f"line {i + job[1]['seed']}\n" for i in range(20)] for job in jobs
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
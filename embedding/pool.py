@@ -0,0 +1,38 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from embedding.program import Program
+
+# True on standard CPython builds. On free-threaded builds (3.13t and later)
+# with the GIL switched off, interpreters in different threads run in parallel.
+GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def default_workers():
+    # Without a GIL, one thread per core; with one, threads only overlap I/O
+    cpus = os.cpu_count() or 1
+    return cpus if not GIL_ENABLED else min(32, cpus + 4)
+
+
+def run_job(job):
+    if isinstance(job, Program):
+        return job.run()
+    return job[0].run(*job[1:])
+
+
+def run_many(jobs, workers=None):
+    """
+    Run prepared programs on a pool of threads and return their RunResults
+    in job order. Each job is a Program, or a (Program, globals) or
+    (Program, globals, output) tuple as passed to Program.run. Every run
+    has its own Interpreter, Environment and output sink, so jobs share
+    nothing but the immutable Programs. The first error raised by a job is
+    re-raised once all jobs have finished.
+    """
+    jobs = list(jobs)
+    if workers is None:
+        workers = default_workers()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        futures = [pool.submit(run_job, job) for job in jobs]
+    return [future.result() for future in futures]
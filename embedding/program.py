@@ -0,0 +1,133 @@
+import copy
+import io
+from collections import namedtuple
+
+from lexer.lexer import Lexer, SourceMap
+from parser.parser import Parser
+from interpreter.interpreter import Environment, Interpreter
+from interpreter.values import NumArray, Map
+from interpreter.async_interpreter import AsyncInterpreter
+from optimizer.optimizer import optimize
+from instrumentation.stats import CountingInterpreter, parse_with_stats
+
+# What Program.run() hands back: the value of the last top-level statement,
+# the captured output text (None when the caller supplied its own sink) and
+# the run's global bindings.
+RunResult = namedtuple("RunResult", ["result", "output", "globals"])
+
+
+def copy_globals(values):
+    """
+    Copy name -> value bindings for one run. Arrays and maps are copied,
+    nested ones too, so a run that changes them leaves `values` as it was
+    for the next run or another thread. Everything else (numbers, strings,
+    Fun nodes, host objects) is never changed in place and stays shared.
+    """
+    copies = {}
+
+    def copy_value(value):
+        if not isinstance(value, (NumArray, Map)):
+            return value
+        copied = copies.get(id(value))
+        if copied is None:
+            if isinstance(value, NumArray):
+                copied = copies[id(value)] = NumArray(copy.copy(value.data), value.kind)
+            else:
+                # Registered before its items, so maps that contain themselves still copy
+                copied = copies[id(value)] = Map()
+                copied.items = {key: copy_value(item) for key, item in value.items.items()}
+        return copied
+
+    return {name: copy_value(value) for name, value in values.items()}
+
+
+class Program:
+    """
+    A MordorLang program that has been lexed and parsed once and can be run
+    many times. The statement tuple is never mutated by the interpreter, so
+    a single Program can be shared freely between threads; every run gets
+    its own Interpreter and global Environment.
+    """
+
+    __slots__ = ("source", "statements", "builtins", "source_map")
+
+    def __init__(self, source, statements, builtins=None):
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "statements", tuple(statements))
+        object.__setattr__(self, "builtins", builtins)
+        object.__setattr__(self, "source_map", SourceMap(source))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("A prepared Program is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("A prepared Program is immutable.")
+
+    def run(self, globals=None, output=None, stats=None):
+        """
+        Execute the program in a fresh global Environment seeded with a
+        copy of the given name -> value bindings (see copy_globals).
+        Output goes to the `output` sink if one is given, otherwise it is
+        captured and returned as text. Pass a RunStats as `stats` to have
+        the interpreter counters recorded in it.
+        """
+        env = Environment()
+        if globals:
+            env.values.update(copy_globals(globals))
+
+        sink = output if output is not None else io.StringIO()
+        if stats is not None:
+            interpreter = CountingInterpreter(
+                stats, env=env, output=sink, builtins=self.builtins, source_map=self.source_map
+            )
+        else:
+            interpreter = Interpreter(
+                env=env, output=sink, builtins=self.builtins, source_map=self.source_map
+            )
+        result = interpreter.execute(self.statements)
+
+        captured = sink.getvalue() if output is None else None
+        return RunResult(result, captured, env.values)
+
+    async def run_async(self, globals=None, output=None, timeout=None, yield_every=1000):
+        """
+        Like run(), but as a coroutine that gives the event loop a turn
+        every `yield_every` steps (see AsyncInterpreter). `output` may be an
+        async sink such as an asyncio.StreamWriter. The run can be
+        cancelled, and raises TimeoutError after `timeout` seconds.
+        """
+        env = Environment()
+        if globals:
+            env.values.update(copy_globals(globals))
+
+        sink = output if output is not None else io.StringIO()
+        interpreter = AsyncInterpreter(
+            yield_every=yield_every,
+            env=env,
+            output=sink,
+            builtins=self.builtins,
+            source_map=self.source_map,
+        )
+        result = await interpreter.run_async(self.statements, timeout=timeout)
+
+        captured = sink.getvalue() if output is None else None
+        return RunResult(result, captured, env.values)
+
+    def __repr__(self):
+        return f"Program({len(self.statements)} statements)"
+
+
+def prepare(source, builtins=None, optimized=True, stats=None):
+    """
+    Lex and parse `source` once, returning an immutable, reusable Program.
+    `builtins` is a BuiltinRegistry of native functions; None means the
+    standard library. `optimized` runs the Optimizer passes over the tree.
+    A RunStats passed as `stats` receives the lex and parse measurements.
+    """
+    if stats is not None:
+        statements = parse_with_stats(source, stats)
+    else:
+        statements = Parser(Lexer(source)).parse()
+    if optimized:
+        statements = optimize(statements)
+    return Program(source, statements, builtins)
@@ -0,0 +1,103 @@
+import hashlib
+import pickle
+import zlib
+
+from abstract_syntax_tree.nodes import Fun, Switch
+from abstract_syntax_tree.walk import child_nodes
+from lexer.lexer import Lexer, SourceMap
+from parser.parser import Parser
+from interpreter.interpreter import Environment, Interpreter
+from optimizer.optimizer import optimize
+
+# A snapshot file is MAGIC, the format version (2 bytes), the sha256 of the
+# prelude source and then the zlib-compressed pickle of its global bindings.
+# Bump SNAPSHOT_VERSION whenever nodes or values change shape, so snapshots
+# written by an older interpreter are rebuilt instead of loaded.
+MAGIC = b"MORDORSNAP"
+SNAPSHOT_VERSION = 5
+HEADER_SIZE = len(MAGIC) + 2 + hashlib.sha256().digest_size
+
+
+def source_digest(source):
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+def drop_positions(values):
+    # Positions in prelude functions point into the prelude, but errors are
+    # resolved against the SourceMap of the program that calls them, so
+    # those errors are reported without a location instead of a wrong one
+    stack = [value for value in values.values() if isinstance(value, Fun)]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        node.pos = None
+        stack.extend(child_nodes(node))
+        if isinstance(node, Switch):
+            stack.append(node.chain)
+
+
+def run_prelude(source, builtins=None, output=None):
+    """
+    Run the prelude `source` in a new global Environment and return it,
+    ready to be shared with the programs that run after it.
+    """
+    env = Environment()
+    statements = optimize(Parser(Lexer(source)).parse())
+    Interpreter(
+        env=env, output=output, builtins=builtins, source_map=SourceMap(source)
+    ).execute(statements)
+    drop_positions(env.values)
+    return env
+
+
+def save_snapshot(path, source, env):
+    """
+    Write the global bindings of `env` (variables, Fun nodes, arrays and
+    maps) to `path`, keyed on the prelude `source` that produced them.
+    Native builtins are not part of the snapshot; they come from the
+    registry the restoring interpreter is given.
+    """
+    payload = zlib.compress(pickle.dumps(env.values, pickle.HIGHEST_PROTOCOL))
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(SNAPSHOT_VERSION.to_bytes(2, "big"))
+        file.write(source_digest(source))
+        file.write(payload)
+
+
+def load_snapshot(path, source):
+    """
+    Return a global Environment restored from the snapshot at `path`, or
+    None if there is no snapshot, it was written by another snapshot
+    version, or the prelude source has changed since. Snapshots are
+    unpickled, so only load files you would also trust as source code.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    header = MAGIC + SNAPSHOT_VERSION.to_bytes(2, "big") + source_digest(source)
+    if data[:HEADER_SIZE] != header:
+        return None
+    env = Environment()
+    env.values = pickle.loads(zlib.decompress(data[HEADER_SIZE:]))
+    return env
+
+
+def warm_start(path, source, builtins=None, output=None):
+    """
+    Global Environment after running the prelude `source`. Restores it
+    from the snapshot at `path` when that is still valid; otherwise runs
+    the prelude and writes a fresh snapshot. Output from the prelude is
+    only produced when it actually runs, so preludes should only define.
+    """
+    env = load_snapshot(path, source)
+    if env is not None:
+        return env
+    env = run_prelude(source, builtins, output)
+    save_snapshot(path, source, env)
+    return env
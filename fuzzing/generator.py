@@ -0,0 +1,213 @@
+import random
+
+# Constants compared against in generated if/elif chains, so that the
+# optimizer turns some of them into jump tables
+CASE_CONSTANTS = [0, 1, 2, 3, 5, 8, -1, 2.5, '"orc"', '"uruk"', "goth", "burzum"]
+STRINGS = ['"orc"', '"Barad-dûr"', '"uruk"', '""', '"Mordor "', '"a\\"b"', '"gate\\n"']
+COMPARISONS = ["==", "!=", "<", "<=", ">", ">="]
+
+
+class ProgramGenerator:
+    """
+    Generates random MordorLang programs from the productions in Parser:
+    assignments, krimp, if/elif/else chains (some shaped for jump tables),
+    while loops, functions with zagh and self-recursion, and expressions
+    mixing numbers, strings, booleans and calls.
+
+    Every program parses and terminates. Loops count a fresh variable up to
+    a small bound, and recursive functions pass a depth that decreases to
+    a base case. A loop's increment and a function's base case sit on the
+    same line as the code they guard, so a line-based minimizer cannot
+    remove one without the other.
+    """
+
+    def __init__(self, seed=None, max_depth=2, globals_count=4):
+        self.rng = random.Random(seed)
+        self.max_depth = max_depth
+        self.global_names = [f"g{i}" for i in range(globals_count)]
+        # The first half only ever hold numbers, for operands of -, * and /
+        self.numeric_names = self.global_names[: globals_count // 2]
+
+    def program(self, statements=8):
+        self.functions = []  # (name, parameter count) of functions defined so far
+        self.loops = 0
+        lines = [f"{name} = {self.rng.randint(0, 20)};" for name in self.numeric_names]
+        lines += [f"{name} = {self.literal()};" for name in self.global_names[len(lines):]]
+        for _ in range(statements):
+            if self.rng.random() < 0.2:
+                lines.extend(self.function())
+            else:
+                lines.extend(self.statement(0, params=None))
+        return "\n".join(lines) + "\n"
+
+    # --------------------------
+    #         Statements
+    # --------------------------
+
+    def statement(self, depth, params):
+        rng = self.rng
+        choices = ["assign", "print", "print", "call"]
+        if depth < self.max_depth:
+            choices += ["if", "switch", "while"]
+        if params is not None:
+            choices += ["return"]
+        kind = rng.choice(choices)
+        if kind == "assign":
+            name = rng.choice(self.global_names)
+            value = self.number(depth, params) if name in self.numeric_names else self.expr(depth, params)
+            return [f"{name} = {value};"]
+        if kind == "print":
+            return [f"krimp({self.expr(depth, params)});"]
+        if kind == "call":
+            call = self.call(depth, params)
+            return [f"{call};"] if call else [f"{rng.choice(self.names(params))};"]
+        if kind == "return":
+            return [f"zagh {self.expr(depth, params)};"]
+        if kind == "if":
+            return self.if_chain(depth, params)
+        if kind == "switch":
+            return self.switch_chain(depth, params)
+        return self.while_loop(depth, params)
+
+    def block(self, depth, params, header, footer="};"):
+        lines = [header]
+        for _ in range(self.rng.randint(1, 2)):
+            lines.extend("    " + line for line in self.statement(depth + 1, params))
+        lines.append(footer)
+        return lines
+
+    def if_chain(self, depth, params):
+        lines = self.block(depth, params, f"gul ({self.condition(depth, params)}) {{", "}")
+        for _ in range(self.rng.randint(0, 2)):
+            lines += self.block(depth, params, f"guulnakh ({self.condition(depth, params)}) {{", "}")
+        if self.rng.random() < 0.5:
+            lines += self.block(depth, params, "skai {", "}")
+        lines[-1] += ";"
+        return lines
+
+    def switch_chain(self, depth, params):
+        # Compare one variable with several constants, as the optimizer looks for
+        name = self.rng.choice(self.names(params))
+        constants = self.rng.sample(CASE_CONSTANTS, self.rng.randint(3, 6))
+        lines = []
+        for i, constant in enumerate(constants):
+            keyword = "gul" if i == 0 else "guulnakh"
+            test = f"{name} == {constant}" if self.rng.random() < 0.8 else f"{constant} == {name}"
+            lines += self.block(depth, params, f"{keyword} ({test}) {{", "}")
+        if self.rng.random() < 0.5:
+            lines += self.block(depth, params, "skai {", "}")
+        lines[-1] += ";"
+        return lines
+
+    def while_loop(self, depth, params):
+        counter = f"w{self.loops}"
+        self.loops += 1
+        bound = self.rng.randint(0, 4)
+        header = f"arburz ({counter} < {bound}) {{ {counter} = {counter} + 1;"
+        return [f"{counter} = 0;"] + self.block(depth, params, header)
+
+    def function(self):
+        name = f"f{len(self.functions)}"
+        params = ["n"] + [f"p{i}" for i in range(self.rng.randint(0, 2))]
+        lines = [f"fun {name}({', '.join(params)}) {{"]
+        if self.rng.random() < 0.6:
+            # Self-recursion on n, in tail position or not
+            args = ", ".join(["n - 1"] + [self.expr(1, params) for _ in params[1:]])
+            recursion = f"{name}({args})"
+            if self.rng.random() < 0.5:
+                recursion = f"{self.expr(2, params)} + {recursion}"
+            base = self.expr(1, params)
+            lines.append(f"    gul (n < 1) {{ zagh {base}; }}; zagh {recursion};")
+        else:
+            for _ in range(self.rng.randint(1, 3)):
+                lines.extend("    " + line for line in self.statement(1, params))
+        lines.append("};")
+        self.functions.append((name, len(params)))
+        return lines
+
+    # --------------------------
+    #        Expressions
+    # --------------------------
+
+    def names(self, params):
+        return self.global_names + (params or [])
+
+    def literal(self):
+        rng = self.rng
+        kind = rng.random()
+        if kind < 0.5:
+            return str(rng.randint(0, 20))
+        if kind < 0.65:
+            return f"{rng.randint(0, 9)}.{rng.randint(0, 9)}"
+        if kind < 0.9:
+            return rng.choice(STRINGS)
+        return rng.choice(["goth", "burzum", "true", "false"])
+
+    def expr(self, depth, params):
+        rng = self.rng
+        if depth >= self.max_depth + 2 or rng.random() < 0.35:
+            return self.atom(params)
+        kind = rng.random()
+        if kind < 0.3:
+            return f"{self.expr(depth + 1, params)} + {self.expr(depth + 1, params)}"
+        if kind < 0.5:
+            return self.number(depth, params)
+        if kind < 0.6:
+            return f"({self.expr(depth + 1, params)})"
+        if kind < 0.7:
+            return f"-({self.number(depth + 1, params)})"
+        if kind < 0.85:
+            call = self.call(depth, params)
+            if call:
+                return call
+        if rng.random() < 0.5:
+            return f"str({self.expr(depth + 1, params)})"
+        return f"abs({self.number(depth + 1, params)})"
+
+    def number(self, depth, params):
+        # Mostly numeric operands for -, * and /, so fewer programs stop at a TypeError
+        rng = self.rng
+        if depth >= self.max_depth + 2 or rng.random() < 0.3:
+            if rng.random() < 0.15:
+                return rng.choice(self.numeric_names + (["n"] if params else []))
+            return str(rng.randint(0, 20)) if rng.random() < 0.8 else f"{rng.randint(0, 9)}.{rng.randint(1, 9)}"
+        if rng.random() < 0.15:
+            return f"len({self.text(depth + 1, params)})"
+        op = rng.choice(["+", "-", "*", "/"])
+        return f"{self.number(depth + 1, params)} {op} {self.number(depth + 1, params)}"
+
+    def text(self, depth, params):
+        rng = self.rng
+        if depth >= self.max_depth + 2 or rng.random() < 0.4:
+            return rng.choice(STRINGS)
+        if rng.random() < 0.5:
+            return f"str({self.expr(depth + 1, params)})"
+        return f"{self.text(depth + 1, params)} + {self.expr(depth + 1, params)}"
+
+    def atom(self, params):
+        if self.rng.random() < 0.5:
+            return self.literal()
+        return self.rng.choice(self.names(params))
+
+    def condition(self, depth, params):
+        rng = self.rng
+        test = self.comparison(depth, params)
+        if rng.random() < 0.25:
+            other = self.comparison(self.max_depth + 1, params)
+            test = f"{test} {rng.choice(['agh', 'urz', 'and', 'or'])} {other}"
+        return test
+
+    def comparison(self, depth, params):
+        # Ordering mostly between numbers; equality between anything
+        op = self.rng.choice(COMPARISONS)
+        if op in ("==", "!=") or self.rng.random() < 0.1:
+            return f"{self.expr(depth + 1, params)} {op} {self.expr(depth + 1, params)}"
+        return f"{self.number(depth + 1, params)} {op} {self.number(depth + 1, params)}"
+
+    def call(self, depth, params):
+        # A call of an earlier function with a small recursion depth, so calls always end
+        if not self.functions:
+            return None
+        name, count = self.rng.choice(self.functions)
+        args = [str(self.rng.randint(0, 6))] + [self.expr(depth + 1, params) for _ in range(count - 1)]
+        return f"{name}({', '.join(args)})"
@@ -0,0 +1,344 @@
+"""
+Differential fuzzing: random programs from ProgramGenerator are run
+through every lexer/parser/engine combination and their output, final
+result and raised error are compared with the reference pipeline
+(Lexer, Parser and the plain Interpreter on the unoptimized tree, with
+the parser's tail-call marks cleared so that every call is a plain one).
+A mismatch is minimized to the fewest source lines that still show it.
+Each engine's time is recorded as well, so every run doubles as a
+throughput comparison.
+
+    python fuzzing/harness.py [--count N] [--seed S] [-k ENGINE] [--save DIR]
+
+Program i is generated from seed S + i, so a reported mismatch can be
+rerun on its own with --seed <its seed> --count 1.
+"""
+import argparse
+import asyncio
+import io
+import os
+import re
+import signal
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abstract_syntax_tree.nodes import FunctionCall
+from abstract_syntax_tree.walk import walk
+from lexer.lexer import Lexer, StreamingLexer, TolkienStream, tokenize
+from lexer.mmap_lexer import MmapLexer
+from parser.parser import Parser
+from parser.incremental import IncrementalParser
+from interpreter.interpreter import Interpreter
+from optimizer.optimizer import Optimizer, optimize
+from embedding.program import prepare
+from embedding.pool import run_many
+from instrumentation.stats import RunStats
+from instrumentation.coverage import Coverage, CoverageInterpreter
+from fuzzing.generator import ProgramGenerator
+
+# What a run is compared on: printed text, repr of the last statement's
+# value, and "ErrorType: message" of the error raised (None if none was).
+Outcome = namedtuple("Outcome", ["output", "result", "error"])
+
+# An engine runs a source text, writing to `output` and returning the
+# result. Engines without a SourceMap report offsets instead of lines and
+# columns, so their errors are compared with the location left out.
+Engine = namedtuple("Engine", ["name", "run", "positions"])
+
+LOCATION = re.compile(r" at (line \d+, column \d+|offset \d+)")
+
+
+class EngineTimeout(Exception):
+    pass
+
+
+def run_reference(source, output):
+    lexer = Lexer(source)
+    statements = Parser(lexer).parse()
+    # Plain calls, so every engine's tail-call elimination is checked against them
+    for node, _ in walk(statements):
+        if isinstance(node, FunctionCall):
+            node.tail = False
+    return Interpreter(output=output, source_map=lexer.source_map).execute(statements)
+
+
+def run_optimized(source, output):
+    lexer = Lexer(source)
+    statements = optimize(Parser(lexer).parse())
+    return Interpreter(output=output, source_map=lexer.source_map).execute(statements)
+
+
+def run_streaming_lexer(source, output):
+    # A tiny chunk size puts chunk boundaries inside most Tolkiens
+    statements = optimize(Parser(StreamingLexer(io.StringIO(source), chunk_size=3)).parse())
+    return Interpreter(output=output).execute(statements)
+
+
+def run_statement_stream(source, output):
+    lexer = Lexer(source)
+    optimizer = Optimizer()
+    statements = (optimizer.visit(stmt) for stmt in Parser(lexer).program_stream())
+    return Interpreter(output=output, source_map=lexer.source_map).execute(statements)
+
+
+def run_mmap(source, output):
+    with tempfile.NamedTemporaryFile("w", suffix=".mordor", encoding="utf-8", delete=False) as file:
+        file.write(source)
+    try:
+        with MmapLexer(file.name) as lexer:
+            statements = optimize(Parser(lexer).parse())
+            interpreter = Interpreter(output=output, source_map=lexer.source_map)
+            return interpreter.execute(statements)
+    finally:
+        os.unlink(file.name)
+
+
+def run_tolkien_stream(source, output):
+    lexer = Lexer(source)
+    stream = TolkienStream(tokenize(lexer), lexer.source_map)
+    return Interpreter(output=output, source_map=stream.source_map).execute(Parser(stream).parse())
+
+
+def run_incremental(source, output):
+    # Change a digit near the middle and change it back, so the tree comes
+    # from edit() rather than from a single full parse
+    incremental = IncrementalParser(source)
+    digits = [m.start() for m in re.finditer(r"\d", source)]
+    if digits:
+        pos = digits[len(digits) // 2]
+        original = source[pos]
+        incremental.edit(pos, pos + 1, "7" if original != "7" else "3")
+        incremental.edit(pos, pos + 1, original)
+    return Interpreter(output=output, source_map=incremental.source_map).execute(
+        incremental.statements()
+    )
+
+
+def run_prepared(source, output):
+    return prepare(source).run(output=output).result
+
+
+def run_async(source, output):
+    # Yield very often so that suspension points land everywhere
+    return asyncio.run(prepare(source).run_async(output=output, yield_every=3)).result
+
+
+def run_async_unoptimized(source, output):
+    program = prepare(source, optimized=False)
+    return asyncio.run(program.run_async(output=output, yield_every=1)).result
+
+
+def run_stats(source, output):
+    stats = RunStats()
+    return prepare(source, stats=stats).run(output=output, stats=stats).result
+
+
+def run_coverage(source, output):
+    lexer = Lexer(source)
+    statements = Parser(lexer).parse()
+    interpreter = CoverageInterpreter(
+        Coverage(statements, lexer.source_map), output=output, source_map=lexer.source_map
+    )
+    return interpreter.execute(statements)
+
+
+def run_thread_pool(source, output):
+    return run_many([(prepare(source), None, output)], workers=1)[0].result
+
+
+REFERENCE = Engine("reference", run_reference, True)
+
+ENGINES = [
+    Engine("optimized", run_optimized, True),
+    Engine("streaming-lexer", run_streaming_lexer, False),
+    Engine("statement-stream", run_statement_stream, True),
+    Engine("mmap-lexer", run_mmap, True),
+    Engine("tolkien-stream", run_tolkien_stream, True),
+    Engine("incremental", run_incremental, True),
+    Engine("prepared", run_prepared, True),
+    Engine("async", run_async, True),
+    Engine("async-unoptimized", run_async_unoptimized, True),
+    Engine("stats", run_stats, True),
+    Engine("coverage", run_coverage, True),
+    Engine("thread-pool", run_thread_pool, True),
+]
+
+
+def on_alarm(signum, frame):
+    raise EngineTimeout("engine did not finish in time")
+
+
+def run_engine(engine, source, timeout=5.0):
+    """Run one engine on `source`; returns its Outcome and the seconds it took."""
+    output = io.StringIO()
+    result = None
+    error = None
+    # Generated programs always end; the alarm guards against engine bugs
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        result = engine.run(source, output)
+    except EngineTimeout as e:
+        error = f"EngineTimeout: {e}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        elapsed = time.perf_counter() - start
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    return comparable(Outcome(output.getvalue(), repr(result), error), engine), elapsed
+
+
+def comparable(outcome, engine):
+    # The Outcome as far as this engine can reproduce it
+    if outcome.error is not None and not engine.positions:
+        return outcome._replace(error=LOCATION.sub("", outcome.error))
+    return outcome
+
+
+def expected_outcome(source, engine):
+    return comparable(run_engine(REFERENCE, source)[0], engine)
+
+
+def parses(source):
+    try:
+        Parser(Lexer(source)).parse()
+    except Exception:
+        return False
+    return True
+
+
+def mismatches(source, engine):
+    # Only valid programs count; deleting lines can leave a syntax error,
+    # which streaming engines legitimately report after some output
+    return parses(source) and run_engine(engine, source)[0] != expected_outcome(source, engine)
+
+
+def block_end(lines, i):
+    # Index of the line closing the block opened at the end of lines[i]
+    depth = 0
+    for j in range(i, len(lines)):
+        depth += lines[j].count("{") - lines[j].count("}")
+        if depth <= 0:
+            return j
+    return None
+
+
+def block_edits(lines):
+    # Drop each block whole, or keep only its body, as in "gul (c) { body };" -> "body"
+    for i, line in enumerate(lines):
+        if line.endswith("{"):
+            j = block_end(lines, i)
+            if j is not None:
+                yield lines[:i] + lines[j + 1:]
+                yield lines[:i] + lines[i + 1:j] + lines[j + 1:]
+
+
+def minimize(source, engine):
+    """
+    Shrink a program on which `engine` disagrees with the reference: first
+    drop or unwrap whole blocks, then delete chunks of lines, halving the
+    chunk size down to single lines, until no edit keeps the disagreement.
+    """
+    def fails(lines):
+        return bool(lines) and mismatches("\n".join(lines) + "\n", engine)
+
+    lines = source.splitlines()
+    while True:
+        before = len(lines)
+        progress = True
+        while progress:
+            progress = False
+            for candidate in block_edits(lines):
+                if fails(candidate):
+                    lines = candidate
+                    progress = True
+                    break
+
+        chunk = max(len(lines) // 2, 1)
+        while True:
+            removed = False
+            i = 0
+            while i < len(lines):
+                candidate = lines[:i] + lines[i + chunk:]
+                if fails(candidate):
+                    lines = candidate
+                    removed = True
+                else:
+                    i += chunk
+            if not removed:
+                if chunk == 1:
+                    break
+                chunk //= 2
+        if len(lines) == before:
+            return "\n".join(lines) + "\n"
+
+
+def describe(outcome):
+    return (
+        f"    output: {outcome.output!r}\n"
+        f"    result: {outcome.result}\n"
+        f"    error:  {outcome.error}"
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Differential fuzzing of MordorLang engines.")
+    arg_parser.add_argument("--count", type=int, default=200, help="programs to generate")
+    arg_parser.add_argument("--seed", type=int, default=0, help="seed of the first program")
+    arg_parser.add_argument("--statements", type=int, default=8, help="top-level statements per program")
+    arg_parser.add_argument("-k", "--engine", action="append", help="only run engines whose name contains this")
+    arg_parser.add_argument("--save", metavar="DIR", help="write minimized failing programs here")
+    arg_parser.add_argument("--no-minimize", action="store_true", help="report failing programs as generated")
+    args = arg_parser.parse_args()
+
+    engines = [e for e in ENGINES if not args.engine or any(k in e.name for k in args.engine)]
+    timings = {engine.name: 0.0 for engine in [REFERENCE] + engines}
+    failures = 0
+    errors = 0
+    for index in range(args.count):
+        seed = args.seed + index
+        source = ProgramGenerator(seed=seed).program(args.statements)
+        expected, elapsed = run_engine(REFERENCE, source)
+        timings[REFERENCE.name] += elapsed
+        errors += expected.error is not None
+        for engine in engines:
+            outcome, elapsed = run_engine(engine, source)
+            timings[engine.name] += elapsed
+            reference = comparable(expected, engine)
+            if outcome == reference:
+                continue
+            failures += 1
+            if not args.no_minimize:
+                source_shown = minimize(source, engine)
+                reference = expected_outcome(source_shown, engine)
+                outcome, _ = run_engine(engine, source_shown)
+            else:
+                source_shown = source
+            print(f"MISMATCH {engine.name} (seed {seed})")
+            print(f"  expected:\n{describe(reference)}\n  got:\n{describe(outcome)}")
+            print("  program:\n" + "".join(f"    {line}\n" for line in source_shown.splitlines()))
+            if args.save:
+                os.makedirs(args.save, exist_ok=True)
+                path = os.path.join(args.save, f"{seed}-{engine.name}.mordor")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(source_shown)
+
+    print(
+        f"{args.count} programs ({errors} ending in a runtime error), "
+        f"{len(engines)} engines, {failures} mismatches"
+    )
+    baseline = timings[REFERENCE.name]
+    for name, total in timings.items():
+        rate = args.count / total if total else float("inf")
+        print(f"  {name:<18} {total * 1000:9.1f} ms  {rate:8.1f} programs/s  {total / baseline:5.2f}x")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json
+
+from abstract_syntax_tree.nodes import Block, If, Switch, While
+from abstract_syntax_tree.walk import child_nodes
+from interpreter.interpreter import Environment, Interpreter
+
+
+def counted_nodes(statements):
+    """
+    The nodes coverage counts, in source order: every statement (top-level
+    or in a Block) and every If and While, elif links included. The
+    original chain a Switch keeps as its fallback is searched too; shared
+    nodes are listed once.
+    """
+    nodes = []
+    seen = set()
+    in_block = {id(statement) for statement in statements}
+    stack = list(reversed(statements))
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, Block):
+            in_block.update(id(statement) for statement in node.statements)
+        if id(node) in in_block or isinstance(node, (If, While)):
+            nodes.append(node)
+        children = list(child_nodes(node))
+        if isinstance(node, Switch):
+            children.append(node.chain)
+        stack.extend(reversed(children))
+    return nodes
+
+
+class Coverage:
+    """
+    Execution counters for one program, filled in by CoverageInterpreter.
+    Only statements, If and While nodes are counted, which is all the
+    line, branch and loop report needs; expressions run uncounted. The
+    counters are dicts keyed by node and owned by the Coverage, so the
+    tree itself is never written to and may be shared (e.g. by a Program
+    running on other threads at the same time).
+
+    Attributes:
+        nodes: The counted nodes, in source order.
+        counts: How many times each statement ran.
+        taken: For If nodes, how many times the condition held.
+        not_taken: For If nodes, how many times it did not.
+        iterations: For While nodes, how many times the body ran.
+    """
+
+    def __init__(self, statements, source_map=None):
+        self.nodes = counted_nodes(statements)
+        self.source_map = source_map
+        self.counts = dict.fromkeys(self.nodes, 0)
+        ifs = [node for node in self.nodes if isinstance(node, If)]
+        self.taken = dict.fromkeys(ifs, 0)
+        self.not_taken = dict.fromkeys(ifs, 0)
+        self.iterations = dict.fromkeys((node for node in self.nodes if isinstance(node, While)), 0)
+
+    def count(self, node):
+        # An elif link is not a statement of its own; it ran whenever its condition was tested
+        if isinstance(node, If):
+            return self.taken[node] + self.not_taken[node]
+        return self.counts[node]
+
+    def location(self, node):
+        # (line, column) of a node, or (None, None) without a position
+        if node.pos is None or self.source_map is None:
+            return None, None
+        return self.source_map.line_col(node.pos)
+
+    def line_counts(self):
+        # line -> the most times any node starting on that line ran
+        lines = {}
+        for node in self.nodes:
+            count = self.count(node)
+            line, _ = self.location(node)
+            if line is not None and count >= lines.get(line, 0):
+                lines[line] = count
+        return lines
+
+    def as_dict(self):
+        nodes = []
+        branches = []
+        loops = []
+        for index, node in enumerate(self.nodes):
+            line, column = self.location(node)
+            where = {"node": index, "line": line, "column": column}
+            nodes.append(dict(where, type=type(node).__name__, count=self.count(node)))
+            if isinstance(node, If):
+                branches.append(dict(where, taken=self.taken[node], not_taken=self.not_taken[node]))
+            elif isinstance(node, While):
+                loops.append(dict(where, iterations=self.iterations[node]))
+        return {"nodes": nodes, "branches": branches, "loops": loops}
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file)
+
+    def annotate(self, source):
+        """
+        The source with each line prefixed by how often it ran: '#####' for
+        code that never ran, '-' for lines with no code. If and While lines
+        also show taken/not-taken and iteration counts.
+        """
+        lines = self.line_counts()
+        notes = {}
+        for node in self.nodes:
+            line, _ = self.location(node)
+            if isinstance(node, If):
+                note = f"taken {self.taken[node]}, not taken {self.not_taken[node]}"
+            elif isinstance(node, While):
+                note = f"{self.iterations[node]} iterations"
+            else:
+                continue
+            notes.setdefault(line, []).append(note)
+
+        annotated = []
+        for number, text in enumerate(source.splitlines(), start=1):
+            count = lines.get(number)
+            prefix = "-" if count is None else "#####" if count == 0 else str(count)
+            suffix = f"    [{'; '.join(notes[number])}]" if number in notes else ""
+            annotated.append(f"{prefix:>9}: {text}{suffix}")
+        return "\n".join(annotated)
+
+    def summary(self):
+        ran = sum(1 for node in self.nodes if self.count(node))
+        both = sum(1 for node in self.taken if self.taken[node] and self.not_taken[node])
+        return (
+            f"{ran} of {len(self.nodes)} statements ran; "
+            f"{both} of {len(self.taken)} branches went both ways"
+        )
+
+
+class CoverageInterpreter(Interpreter):
+    """
+    An Interpreter that fills in a Coverage. Run it on the tree the
+    Coverage was built from; kept as a subclass so the plain Interpreter
+    pays nothing for the counters. Statements are counted where Blocks and
+    execute() run them, so visit() itself is not wrapped and expressions
+    cost the same as in a plain run.
+    """
+
+    def __init__(self, coverage, **kwargs):
+        super().__init__(**kwargs)
+        self.coverage = coverage
+        self.counts = coverage.counts
+
+    def execute(self, statements):
+        counts = self.counts
+        result = None
+        for statement in statements:
+            counts[statement] += 1
+            result = self.visit(statement)
+        return result
+
+    def visit_Block(self, node: Block):
+        # Interpreter.visit_Block with a count per statement
+        previous_env = self.env
+        self.env = Environment(parent=previous_env)
+        counts = self.counts
+        result = None
+
+        for statement in node.statements:
+            counts[statement] += 1
+            result = self.visit(statement)
+        self.env = previous_env
+        return result
+
+    def visit_If(self, node: If):
+        if self.visit(node.condition):
+            self.coverage.taken[node] += 1
+            return self.visit(node.then_branch)
+        self.coverage.not_taken[node] += 1
+        if node.else_branch is not None:
+            return self.visit(node.else_branch)
+        return None
+
+    def visit_While(self, node: While):
+        iterations = self.coverage.iterations
+        while self.visit(node.condition):
+            iterations[node] += 1
+            self.visit(node.body)
+        return None
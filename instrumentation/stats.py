@@ -0,0 +1,125 @@
+import time
+
+from lexer.lexer import Lexer, SourceMap, TolkienStream, tokenize
+from parser.parser import Parser
+from interpreter.interpreter import Interpreter, MISSING
+from abstract_syntax_tree.nodes import Block, FunctionCall
+from abstract_syntax_tree.walk import walk
+
+
+class RunStats:
+    """
+    Phase timings and counters for one lex/parse/execute run. Times are in
+    seconds. Filled in by parse_with_stats() and CountingInterpreter; the
+    normal Lexer, Parser and Interpreter paths never touch it, so there is
+    no cost unless stats are asked for.
+    """
+
+    def __init__(self):
+        # Lexer
+        self.tolkiens = 0
+        self.lex_time = 0.0
+        # Parser
+        self.nodes = 0
+        self.max_depth = 0
+        self.parse_time = 0.0
+        # Interpreter
+        self.nodes_evaluated = 0
+        self.function_calls = 0
+        self.environments = 0
+        self.peak_scope_depth = 0
+        self.execute_time = 0.0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def report(self):
+        return "\n".join(
+            [
+                "MordorLang run statistics",
+                f"  lex      {self.lex_time * 1000:10.2f} ms  {self.tolkiens} tolkiens",
+                f"  parse    {self.parse_time * 1000:10.2f} ms  {self.nodes} nodes, max depth {self.max_depth}",
+                f"  execute  {self.execute_time * 1000:10.2f} ms  {self.nodes_evaluated} nodes evaluated, "
+                f"{self.function_calls} calls",
+                f"           {self.environments} environments allocated, peak scope depth {self.peak_scope_depth}",
+            ]
+        )
+
+    def __repr__(self):
+        return f"RunStats({self.as_dict()})"
+
+
+def parse_with_stats(source, stats):
+    """
+    Lex and parse `source` as separate timed phases, recording Tolkien and
+    node counts in `stats`. Returns the statement list.
+    """
+    start = time.perf_counter()
+    tolkiens = tokenize(Lexer(source))
+    stats.lex_time = time.perf_counter() - start
+    stats.tolkiens = len(tolkiens)
+
+    start = time.perf_counter()
+    statements = Parser(TolkienStream(tolkiens, SourceMap(source))).parse()
+    stats.parse_time = time.perf_counter() - start
+
+    nodes = 0
+    max_depth = 0
+    for _, depth in walk(statements):
+        nodes += 1
+        max_depth = max(max_depth, depth)
+    stats.nodes = nodes
+    stats.max_depth = max_depth
+    return statements
+
+
+class CountingInterpreter(Interpreter):
+    """
+    An Interpreter that records evaluation counters in a RunStats. Kept as
+    a subclass so the plain Interpreter pays nothing for them.
+    """
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        self.scope_depth = 1
+        stats.environments += 1
+        stats.peak_scope_depth = max(stats.peak_scope_depth, 1)
+
+    def execute(self, statements):
+        start = time.perf_counter()
+        try:
+            # The loop of Interpreter.execute, inlined to leave the stack as deep as a plain run
+            result = None
+            for statement in statements:
+                result = self.visit(statement)
+            return result
+        finally:
+            self.stats.execute_time += time.perf_counter() - start
+
+    def visit(self, node):
+        stats = self.stats
+        stats.nodes_evaluated += 1
+        # Dispatch here rather than through super() to avoid an extra frame per node
+        visitor = getattr(self, f"visit_{type(node).__name__}", self.no_visit_method)
+        kind = type(node)
+        if kind is FunctionCall:
+            stats.function_calls += 1
+            # Builtins run without an Environment; only program functions get one
+            if self.env.lookup(node.func_name) is MISSING:
+                return visitor(node)
+        elif kind is not Block:
+            return visitor(node)
+        # Scopes are counted here too, not in visit_Block/visit_FunctionCall
+        # overrides, so that instrumented runs recurse no deeper than plain ones
+        self.enter_scope()
+        try:
+            return visitor(node)
+        finally:
+            self.scope_depth -= 1
+
+    def enter_scope(self):
+        self.stats.environments += 1
+        self.scope_depth += 1
+        if self.scope_depth > self.stats.peak_scope_depth:
+            self.stats.peak_scope_depth = self.scope_depth
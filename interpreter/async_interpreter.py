@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+import sys
+
+from abstract_syntax_tree.nodes import Fun, FunctionCall, Print, While
+from abstract_syntax_tree.walk import child_nodes
+from interpreter.builtins import Builtin
+from interpreter.interpreter import Environment, Interpreter, MISSING, ReturnException, TailCall
+from interpreter.values import NumArray, Map
+
+
+class AsyncInterpreter(Interpreter):
+    """
+    An Interpreter for hosting scripts inside an asyncio program. It runs
+    the same tree with the same semantics, but hands control back to the
+    event loop every `yield_every` steps, where a step is a statement or
+    expression that can run for an unbounded time, or one loop iteration.
+    Because it awaits there, the run can be cancelled or timed out like
+    any other task.
+
+    Subtrees with no loop, call or output in them can only take a bounded
+    time, so they are evaluated by the ordinary synchronous visitors and
+    count as a single step.
+
+    The output sink may be asynchronous: if write() returns an awaitable it
+    is awaited, and a drain() coroutine (asyncio.StreamWriter) is awaited
+    after every line.
+    """
+
+    def __init__(self, yield_every=1000, **kwargs):
+        super().__init__(**kwargs)
+        self.yield_every = yield_every
+        self.steps = 0
+        # node -> whether it can be evaluated synchronously
+        self.bounded = {}
+
+    async def run_async(self, statements, timeout=None):
+        """
+        Run top-level statements and return the last result. A `timeout` in
+        seconds raises TimeoutError if the script is still running by then.
+        """
+        if timeout is not None:
+            return await asyncio.wait_for(self.execute_async(statements), timeout)
+        return await self.execute_async(statements)
+
+    async def execute_async(self, statements):
+        result = None
+        for statement in statements:
+            result = await self.visit_async(statement)
+        return result
+
+    def is_bounded(self, node):
+        # A node is bounded if nothing below it loops, calls a function or writes output
+        bounded = self.bounded.get(node)
+        if bounded is None:
+            if isinstance(node, Fun):
+                # Defining a function does not run its body
+                bounded = True
+            elif isinstance(node, (While, FunctionCall, Print)):
+                bounded = False
+            else:
+                bounded = all(self.is_bounded(child) for child in child_nodes(node))
+            self.bounded[node] = bounded
+        return bounded
+
+    async def visit_async(self, node):
+        self.steps += 1
+        if self.steps >= self.yield_every:
+            self.steps = 0
+            await asyncio.sleep(0)
+        if self.is_bounded(node):
+            return self.visit(node)
+        visitor = getattr(self, f"visit_async_{type(node).__name__}", None)
+        if visitor is None:
+            self.no_visit_method(node)
+        return await visitor(node)
+
+    async def visit_async_BinaryOp(self, node):
+        left_value = await self.visit_async(node.left)
+        return self.binary_op(node, left_value, await self.visit_async(node.right))
+
+    async def visit_async_CompareOp(self, node):
+        left = await self.visit_async(node.left)
+        return self.compare_op(node, left, await self.visit_async(node.right))
+
+    async def visit_async_LogicalOp(self, node):
+        left_value = await self.visit_async(node.left)
+        return self.logical_op(node, left_value, await self.visit_async(node.right))
+
+    async def visit_async_UnaryOp(self, node):
+        return self.unary_op(node, await self.visit_async(node.operand))
+
+    async def visit_async_Assign(self, node):
+        value = await self.visit_async(node.expr)
+        self.env.assign(node.var_name, value)
+        return value
+
+    async def visit_async_ArrayLiteral(self, node):
+        return NumArray.from_values([await self.visit_async(element) for element in node.elements])
+
+    async def visit_async_Index(self, node):
+        container = await self.visit_async(node.target)
+        return self.load_index(node, container, await self.visit_async(node.index))
+
+    async def visit_async_IndexAssign(self, node):
+        container = await self.visit_async(node.target)
+        index = await self.visit_async(node.index)
+        return self.store_index(node, container, index, await self.visit_async(node.expr))
+
+    async def visit_async_MapLiteral(self, node):
+        table = Map()
+        for key_expr, value_expr in node.entries:
+            key = await self.visit_async(key_expr)
+            try:
+                table[key] = await self.visit_async(value_expr)
+            except TypeError:
+                raise Exception(f"{key} cannot be used as a map key{self.where(key_expr)}.")
+        return table
+
+    async def visit_async_Print(self, node):
+        value = await self.visit_async(node.expr)
+        output = self.output if self.output is not None else sys.stdout
+        written = output.write(f"{value}\n")
+        if inspect.isawaitable(written):
+            await written
+        drain = getattr(output, "drain", None)
+        if drain is not None:
+            await drain()
+        return value
+
+    async def visit_async_Block(self, node):
+        previous_env = self.env
+        self.env = Environment(parent=previous_env)
+        result = None
+        for statement in node.statements:
+            result = await self.visit_async(statement)
+        self.env = previous_env
+        return result
+
+    async def visit_async_If(self, node):
+        if await self.visit_async(node.condition):
+            return await self.visit_async(node.then_branch)
+        elif node.else_branch is not None:
+            return await self.visit_async(node.else_branch)
+        return None
+
+    async def visit_async_Switch(self, node):
+        value = self.env.lookup(node.var_name)
+        if value is MISSING:
+            return await self.visit_async(node.chain)
+        try:
+            branch = node.cases.get(value, node.default)
+        except TypeError:
+            branch = node.chain
+        if branch is None:
+            return None
+        return await self.visit_async(branch)
+
+    async def visit_async_While(self, node):
+        # Each iteration of the condition counts as a step, so even an
+        # empty loop body gives the event loop a turn
+        while await self.visit_async(node.condition):
+            await self.visit_async(node.body)
+        return None
+
+    async def visit_async_FunctionCall(self, node):
+        func_node = self.resolve_call(node)
+        if isinstance(func_node, Builtin):
+            return func_node.func(*[await self.visit_async(arg) for arg in node.arguments])
+
+        previous_env = self.env
+        self.env = Environment(parent=previous_env)
+        for param_name, arg_expr in zip(func_node.params, node.arguments):
+            self.env.define(param_name, await self.visit_async(arg_expr))
+
+        if node.tail and func_node is self.function:
+            raise TailCall(self.env.values)
+
+        call_env = self.env
+        previous_function = self.function
+        self.function = func_node
+        result = None
+        while True:
+            try:
+                result = await self.visit_async(func_node.body)
+            except ReturnException as re:
+                result = re.value
+            except TailCall as tail:
+                call_env.values = tail.values
+                self.env = call_env
+                continue
+            break
+        self.env = previous_env
+        self.function = previous_function
+        return result
+
+    async def visit_async_Return(self, node):
+        value = await self.visit_async(node.expr) if node.expr else None
+        raise ReturnException(value)
@@ -0,0 +1,183 @@
+import math
+
+from interpreter.values import NumArray, Map
+
+
+class Builtin:
+    """
+    A host-provided Python callable exposed to MordorLang under a name.
+
+    Attributes:
+        name: The MordorLang name the function is called by.
+        func: The Python callable; receives the evaluated arguments positionally.
+        min_args: The fewest arguments accepted.
+        max_args: The most arguments accepted, or None for no upper limit.
+    """
+
+    __slots__ = ("name", "func", "min_args", "max_args")
+
+    def __init__(self, name, func, min_args, max_args):
+        self.name = name
+        self.func = func
+        self.min_args = min_args
+        self.max_args = max_args
+
+    def accepts(self, count):
+        return count >= self.min_args and (self.max_args is None or count <= self.max_args)
+
+    def __repr__(self):
+        return f"Builtin({self.name})"
+
+
+class BuiltinRegistry:
+    """
+    Maps MordorLang names to Builtin functions. Pass one to Interpreter to
+    control which native functions a program can call; names defined by the
+    program itself (functions or variables) always shadow builtins.
+    """
+
+    def __init__(self, functions=None):
+        self.functions = dict(functions) if functions else {}
+
+    def register(self, name, func, arity=None):
+        """
+        Register `func` under `name`. `arity` is an exact argument count,
+        a (min, max) tuple with max None meaning variadic, or None for any.
+        """
+        if arity is None:
+            min_args, max_args = 0, None
+        elif isinstance(arity, tuple):
+            min_args, max_args = arity
+        else:
+            min_args, max_args = arity, arity
+        self.functions[name] = Builtin(name, func, min_args, max_args)
+
+    def get(self, name):
+        return self.functions.get(name)
+
+    def copy(self):
+        # Start a host registry from the standard library without mutating it
+        return BuiltinRegistry(self.functions)
+
+    def __contains__(self, name):
+        return name in self.functions
+
+
+# --------------------------
+#     Standard Library
+# --------------------------
+
+
+def _num(value):
+    # Convert text to a number the same way the lexer reads numeric literals
+    if isinstance(value, str):
+        value = value.strip()
+        return float(value) if "." in value else int(value)
+    return value
+
+
+def _min(*args):
+    # min(array) reduces the array; min(a, b, ...) compares the arguments
+    if len(args) == 1 and isinstance(args[0], NumArray):
+        return args[0].min()
+    return min(args)
+
+
+def _max(*args):
+    if len(args) == 1 and isinstance(args[0], NumArray):
+        return args[0].max()
+    return max(args)
+
+
+def _sum(values):
+    if isinstance(values, NumArray):
+        return values.sum()
+    raise Exception("sum() needs an array.")
+
+
+def _any(values):
+    return bool(values.data.any()) if hasattr(values.data, "any") else any(values.data)
+
+
+def _all(values):
+    return bool(values.data.all()) if hasattr(values.data, "all") else all(values.data)
+
+
+def _keys(table):
+    # Keys and values come back as a map indexed 0, 1, 2, ... for use with len()
+    return Map(enumerate(table.items))
+
+
+def _values(table):
+    return Map(enumerate(table.items.values()))
+
+
+def _map_key(key):
+    # Arrays and maps are unhashable, as for map literals and m[k] = v
+    try:
+        hash(key)
+    except TypeError:
+        raise Exception(f"{key} cannot be used as a map key.") from None
+    return key
+
+
+def _has(table, key):
+    return _map_key(key) in table
+
+
+def _remove(table, key):
+    # goth if the key was there, so nothing leaks out as None
+    key = _map_key(key)
+    if key not in table.items:
+        return False
+    del table.items[key]
+    return True
+
+
+def _slice(text, start, end=None):
+    return text[start:end]
+
+
+def _find(text, sub):
+    return text.find(sub)
+
+
+STANDARD_LIBRARY = BuiltinRegistry()
+
+# Numeric
+STANDARD_LIBRARY.register("abs", abs, 1)
+STANDARD_LIBRARY.register("min", _min, (1, None))
+STANDARD_LIBRARY.register("max", _max, (1, None))
+STANDARD_LIBRARY.register("round", round, (1, 2))
+STANDARD_LIBRARY.register("floor", math.floor, 1)
+STANDARD_LIBRARY.register("ceil", math.ceil, 1)
+STANDARD_LIBRARY.register("sqrt", math.sqrt, 1)
+STANDARD_LIBRARY.register("pow", pow, 2)
+STANDARD_LIBRARY.register("mod", lambda a, b: a % b, 2)
+
+# Conversion
+STANDARD_LIBRARY.register("str", str, 1)
+STANDARD_LIBRARY.register("num", _num, 1)
+
+# Text
+STANDARD_LIBRARY.register("len", len, 1)
+STANDARD_LIBRARY.register("slice", _slice, (2, 3))
+STANDARD_LIBRARY.register("find", _find, 2)
+STANDARD_LIBRARY.register("replace", lambda text, old, new: text.replace(old, new), 3)
+STANDARD_LIBRARY.register("upper", lambda text: text.upper(), 1)
+STANDARD_LIBRARY.register("lower", lambda text: text.lower(), 1)
+STANDARD_LIBRARY.register("trim", lambda text: text.strip(), 1)
+STANDARD_LIBRARY.register("repeat", lambda text, times: text * times, 2)
+
+# Maps (len above also accepts maps)
+STANDARD_LIBRARY.register("has", _has, 2)
+STANDARD_LIBRARY.register("keys", _keys, 1)
+STANDARD_LIBRARY.register("values", _values, 1)
+STANDARD_LIBRARY.register("remove", _remove, 2)
+
+# Arrays (len, min and max above also accept arrays)
+STANDARD_LIBRARY.register("sum", _sum, 1)
+STANDARD_LIBRARY.register("any", _any, 1)
+STANDARD_LIBRARY.register("all", _all, 1)
+STANDARD_LIBRARY.register("fill", NumArray.filled, 2)
+STANDARD_LIBRARY.register("range", NumArray.range, (1, 2))
@@ -1,3 +1,5 @@
+import sys
+
 from abstract_syntax_tree.nodes import (
     Number,
     BinaryOp,
@@ -15,7 +17,18 @@ from abstract_syntax_tree.nodes import (
     Fun,
     FunctionCall,
     Return,
+    ArrayLiteral,
+    Index,
+    IndexAssign,
+    MapLiteral,
+    Switch,
 )
+from lexer.lexer import where
+from interpreter.builtins import Builtin, STANDARD_LIBRARY
+from interpreter.values import NumArray, Map
+
+# Marks a name with no binding in any enclosing Environment
+MISSING = object()
 
 
 class ReturnException(Exception):
@@ -29,6 +42,17 @@ class ReturnException(Exception):
         self.value = value
 
 
+class TailCall(Exception):
+    """
+    Raised by a tail call of the running function, carrying the new
+    parameter bindings. The running call catches it, rebinds its
+    parameters and runs the body again instead of nesting a new call.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+
 class Environment:
     def __init__(self, parent=None):
         self.values = {}
@@ -55,10 +79,27 @@ class Environment:
         else:
             raise Exception(f"Undefined variable: {name}")
 
+    def lookup(self, name, default=MISSING):
+        # Like get(), but returns default instead of raising when undefined
+        env = self
+        while env is not None:
+            if name in env.values:
+                return env.values[name]
+            env = env.parent
+        return default
+
 
 class Interpreter:
-    def __init__(self):
-        self.env = Environment()
+    def __init__(self, env=None, output=None, builtins=None, source_map=None):
+        # output is any object with write(); None means the current sys.stdout
+        self.env = env if env is not None else Environment()
+        self.output = output
+        # Native functions callable by name unless the program shadows them
+        self.builtins = builtins if builtins is not None else STANDARD_LIBRARY
+        # Turns node positions into line/column in runtime error messages
+        self.source_map = source_map
+        # The Fun whose body is running, for recognising tail calls of it
+        self.function = None
 
     def visit(self, node):
         method_name = f"visit_{type(node).__name__}"
@@ -68,14 +109,32 @@ class Interpreter:
     def no_visit_method(self, node):
         raise Exception(f"No visit_{type(node).__name__} method defined.")
 
+    def where(self, node):
+        # " at line L, column C" for errors raised while evaluating node
+        return where(node.pos, self.source_map)
+
+    def execute(self, statements):
+        """
+        Run top-level statements in order and return the last result.
+        Accepts a list or a stream from Parser.program_stream(); each
+        statement is dropped once it has run.
+        """
+        result = None
+        for statement in statements:
+            result = self.visit(statement)
+        return result
+
 
     #   Basic AST Visitors
     def visit_Number(self, node: Number):
         return node.value
 
+    # The visitors for operators, indexing and calls evaluate their operands
+    # and hand the values to a helper, which AsyncInterpreter shares.
     def visit_BinaryOp(self, node: BinaryOp):
-        left_value = self.visit(node.left)
-        right_value = self.visit(node.right)
+        return self.binary_op(node, self.visit(node.left), self.visit(node.right))
+
+    def binary_op(self, node, left_value, right_value):
         if node.op == "+":
             # Support addition of strings or numbers
             if isinstance(left_value, str) or isinstance(right_value, str):
@@ -86,8 +145,9 @@ class Interpreter:
         elif node.op == "*":
             return left_value * right_value
         elif node.op == "/":
-            if right_value == 0:
-                raise ZeroDivisionError("Cannot divide by zero.")
+            # Arrays check their own divisors element-wise
+            if not isinstance(right_value, NumArray) and right_value == 0:
+                raise ZeroDivisionError(f"Cannot divide by zero{self.where(node)}.")
             return left_value / right_value
         else:
             raise Exception(f"Unknown operator: {node.op}")
@@ -96,8 +156,9 @@ class Interpreter:
         return node.value
 
     def visit_CompareOp(self, node: CompareOp):
-        left = self.visit(node.left)
-        right = self.visit(node.right)
+        return self.compare_op(node, self.visit(node.left), self.visit(node.right))
+
+    def compare_op(self, node, left, right):
         if node.op == "==":
             return left == right
         elif node.op == "!=":
@@ -114,8 +175,9 @@ class Interpreter:
             raise Exception(f"Unknown compare operator: {node.op}")
 
     def visit_LogicalOp(self, node: LogicalOp):
-        left_value = self.visit(node.left)
-        right_value = self.visit(node.right)
+        return self.logical_op(node, self.visit(node.left), self.visit(node.right))
+
+    def logical_op(self, node, left_value, right_value):
         if node.op in ("agh", "and"):
             return left_value and right_value
         elif node.op in ("urz", "or"):
@@ -124,7 +186,9 @@ class Interpreter:
             raise Exception(f"Unknown logical operator: {node.op}")
 
     def visit_UnaryOp(self, node: UnaryOp):
-        operand_value = self.visit(node.operand)
+        return self.unary_op(node, self.visit(node.operand))
+
+    def unary_op(self, node, operand_value):
         if node.op == "not":
             return not operand_value
         elif node.op == "-":
@@ -143,12 +207,59 @@ class Interpreter:
         return value
 
     def visit_Var(self, node: Var):
-        return self.env.get(node.var_name)
+        value = self.env.lookup(node.var_name)
+        if value is MISSING:
+            raise Exception(f"Undefined variable: {node.var_name}{self.where(node)}")
+        return value
+
+    # Arrays
+    def visit_ArrayLiteral(self, node: ArrayLiteral):
+        return NumArray.from_values([self.visit(element) for element in node.elements])
+
+    def visit_Index(self, node: Index):
+        return self.load_index(node, self.visit(node.target), self.visit(node.index))
+
+    def load_index(self, node, container, index):
+        try:
+            return container[index]
+        except IndexError:
+            raise Exception(f"Index {index} wanders beyond the borders of {node.target}{self.where(node)}.")
+        except KeyError:
+            raise Exception(f"The key {index!r} is not found in {node.target}{self.where(node)}.")
+        except TypeError:
+            raise Exception(f"Cannot index {type(container).__name__} with {index!r}{self.where(node)}.")
+
+    def visit_IndexAssign(self, node: IndexAssign):
+        container = self.visit(node.target)
+        index = self.visit(node.index)
+        return self.store_index(node, container, index, self.visit(node.expr))
+
+    def store_index(self, node, container, index, value):
+        try:
+            container[index] = value
+        except IndexError:
+            raise Exception(f"Index {index} wanders beyond the borders of {node.target}{self.where(node)}.")
+        except TypeError:
+            raise Exception(f"Cannot assign into {type(container).__name__} at {index!r}{self.where(node)}.")
+        return value
+
+    # Maps
+    def visit_MapLiteral(self, node: MapLiteral):
+        table = Map()
+        for key_expr, value_expr in node.entries:
+            key = self.visit(key_expr)
+            try:
+                table[key] = self.visit(value_expr)
+            except TypeError:
+                raise Exception(f"{key} cannot be used as a map key{self.where(key_expr)}.")
+        return table
 
     # Print & Block
     def visit_Print(self, node: Print):
         value = self.visit(node.expr)
-        print(value)
+        # One write per line, so interpreters sharing a sink never split a line
+        output = self.output if self.output is not None else sys.stdout
+        output.write(f"{value}\n")
         return value
 
     def visit_Block(self, node: Block):
@@ -171,6 +282,21 @@ class Interpreter:
             return self.visit(node.else_branch)
         return None
 
+    def visit_Switch(self, node: Switch):
+        # One hashed lookup instead of testing each condition in turn
+        value = self.env.lookup(node.var_name)
+        if value is MISSING:
+            # The chain's first condition reports it, with the variable's position
+            return self.visit(node.chain)
+        try:
+            branch = node.cases.get(value, node.default)
+        except TypeError:
+            # Unhashable values (arrays) take the original comparison chain
+            branch = node.chain
+        if branch is None:
+            return None
+        return self.visit(branch)
+
     def visit_While(self, node: While):
         while self.visit(node.condition):
             self.visit(node.body)
@@ -201,16 +327,9 @@ class Interpreter:
         4. Execute the function body
         5. Catch ReturnException for an early return
         """
-        # Retrieve the function from environment
-        func_node = self.env.get(node.func_name)
-
-        # Distinguish between 'Fun' or 'FunctionDef' or raise error if not found
-        if not (hasattr(func_node, "params") and hasattr(func_node, "body")):
-            raise Exception(f"'{node.func_name}' is not a function.")
-
-        # Check argument count
-        if len(node.arguments) != len(func_node.params):
-            raise Exception("Argument count mismatch.")
+        func_node = self.resolve_call(node)
+        if isinstance(func_node, Builtin):
+            return self.call_builtin(func_node, node)
 
         # Create a new environment for the function call
         previous_env = self.env
@@ -221,17 +340,62 @@ class Interpreter:
             arg_value = self.visit(arg_expr)
             self.env.define(param_name, arg_value)
 
-        # Execute body
+        if node.tail and func_node is self.function:
+            # Hand the bindings to the running call of this function
+            raise TailCall(self.env.values)
+
+        # Execute body, again for every tail call it makes of itself
+        call_env = self.env
+        previous_function = self.function
+        self.function = func_node
         result = None
-        try:
-            result = self.visit(func_node.body)
-        except ReturnException as re:
-            result = re.value
+        while True:
+            try:
+                result = self.visit(func_node.body)
+            except ReturnException as re:
+                result = re.value
+            except TailCall as tail:
+                call_env.values = tail.values
+                self.env = call_env
+                continue
+            break
 
         # Restore environment
         self.env = previous_env
+        self.function = previous_function
         return result
 
+    def resolve_call(self, node: FunctionCall):
+        """
+        The Fun node or Builtin a call refers to, after checking its
+        argument count.
+        """
+        # Retrieve the function from environment, falling back to builtins
+        func_node = self.env.lookup(node.func_name)
+        if func_node is MISSING:
+            builtin = self.builtins.get(node.func_name)
+            if builtin is None:
+                raise Exception(f"Undefined variable: {node.func_name}{self.where(node)}")
+            if not builtin.accepts(len(node.arguments)):
+                raise Exception(f"Argument count mismatch{self.where(node)}.")
+            return builtin
+
+        # Distinguish between 'Fun' or 'FunctionDef' or raise error if not found
+        if not (hasattr(func_node, "params") and hasattr(func_node, "body")):
+            raise Exception(f"'{node.func_name}' is not a function{self.where(node)}.")
+
+        # Check argument count
+        if len(node.arguments) != len(func_node.params):
+            raise Exception(f"Argument count mismatch{self.where(node)}.")
+        return func_node
+
+    def call_builtin(self, builtin, node: FunctionCall):
+        """
+        Call a native function directly: no Environment is created and no
+        ReturnException is involved, the Python return value is the result.
+        """
+        return builtin.func(*[self.visit(arg) for arg in node.arguments])
+
     def visit_Return(self, node: Return):
         """
         Raise ReturnException to unwind the function body.
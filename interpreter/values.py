@@ -0,0 +1,292 @@
+import operator
+from array import array
+from itertools import repeat
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; the array module backend is used instead
+    numpy = None
+
+# Element kinds, ordered so that max() gives the kind two operands widen to
+BOOL, INT, FLOAT = 0, 1, 2
+TYPECODES = ("b", "q", "d")
+DTYPES = ("bool", "int64", "float64")
+PY_TYPES = (bool, int, float)
+# Bounds of an int element; values outside them never wrap around silently
+INT_MIN, INT_MAX = -(1 << 63), (1 << 63) - 1
+# Float estimates below this magnitude are certain to fit in an int element
+SAFE_ESTIMATE = 2.0 ** 62
+
+
+def too_large(value):
+    return Exception(f"The number {value} is too mighty for the host of an array to hold.")
+
+
+def kind_of(value):
+    # bool is checked first because it is a subclass of int
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, int):
+        if not INT_MIN <= value <= INT_MAX:
+            raise too_large(value)
+        return INT
+    if isinstance(value, float):
+        return FLOAT
+    raise Exception(f"Only numbers may join the host of an array, not {value!r}")
+
+
+def make_data(values, kind):
+    if numpy is not None:
+        return numpy.fromiter(values, dtype=DTYPES[kind])
+    return array(TYPECODES[kind], values)
+
+
+def checked_int64(fn, left, right):
+    # fn over int64 operands, raising where NumPy would silently wrap around.
+    # A float estimate settles almost every case; only results near the
+    # bounds are recomputed exactly with Python ints.
+    estimate = fn(numpy.asarray(left, dtype="float64"), numpy.asarray(right, dtype="float64"))
+    if not estimate.size or numpy.abs(estimate).max() < SAFE_ESTIMATE:
+        return fn(left, right).astype("int64", copy=False)
+    exact = fn(numpy.asarray(left, dtype=object), numpy.asarray(right, dtype=object))
+    for value in exact:
+        if not INT_MIN <= value <= INT_MAX:
+            raise too_large(value)
+    return exact.astype("int64")
+
+
+class NumArray:
+    """
+    A typed numeric array value. Elements are stored in a NumPy ndarray
+    when NumPy is installed, otherwise in an array.array, so arithmetic and
+    comparisons run over the whole array in C rather than in a MordorLang
+    loop. Operators work element-wise between two arrays of the same length
+    or between an array and a scalar; comparisons produce a boolean array.
+
+    Attributes:
+        data: The backing array.array or numpy.ndarray.
+        kind: BOOL, INT or FLOAT; the element type of data.
+    """
+
+    __slots__ = ("data", "kind")
+    __hash__ = None
+
+    def __init__(self, data, kind):
+        self.data = data
+        self.kind = kind
+
+    @classmethod
+    def from_values(cls, values):
+        values = list(values)
+        kind = max(map(kind_of, values), default=FLOAT)
+        return cls(make_data(values, kind), kind)
+
+    @classmethod
+    def filled(cls, length, value):
+        kind = kind_of(value)
+        if numpy is not None:
+            return cls(numpy.full(length, value, dtype=DTYPES[kind]), kind)
+        return cls(array(TYPECODES[kind], [value]) * length, kind)
+
+    @classmethod
+    def range(cls, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        if numpy is not None:
+            return cls(numpy.arange(start, stop, dtype="int64"), INT)
+        return cls(array("q", range(start, stop)), INT)
+
+    # --------------------------
+    #     Elements
+    # --------------------------
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        # Hand back plain Python numbers, never NumPy scalars or 0/1 flags
+        return PY_TYPES[self.kind](self.data[operator.index(index)])
+
+    def __setitem__(self, index, value):
+        kind = kind_of(value)
+        if kind > self.kind:
+            self.retype(kind)
+        self.data[operator.index(index)] = value
+
+    def retype(self, kind):
+        # Widen in place, e.g. when a float is stored into an int array
+        if numpy is not None:
+            self.data = self.data.astype(DTYPES[kind])
+        else:
+            self.data = array(TYPECODES[kind], self.data)
+        self.kind = kind
+
+    def tolist(self):
+        return [PY_TYPES[self.kind](value) for value in self.data.tolist()]
+
+    # --------------------------
+    #     Reductions
+    # --------------------------
+
+    def sum(self):
+        # Exact, like MordorLang's scalar ints, even where int64 would wrap
+        if numpy is not None:
+            if self.kind == INT and numpy.abs(self.data.astype("float64")).sum() >= SAFE_ESTIMATE:
+                return sum(self.data.tolist())
+            return self.data.sum().item()
+        return sum(self.data)
+
+    def min(self):
+        if not len(self.data):
+            raise Exception("There is no least of an empty array.")
+        return PY_TYPES[self.kind](self.data.min() if numpy is not None else min(self.data))
+
+    def max(self):
+        if not len(self.data):
+            raise Exception("There is no greatest of an empty array.")
+        return PY_TYPES[self.kind](self.data.max() if numpy is not None else max(self.data))
+
+    # --------------------------
+    #     Element-wise operators
+    # --------------------------
+
+    def elementwise(self, fn, other, reflected, kind):
+        if isinstance(other, NumArray):
+            if len(other.data) != len(self.data):
+                raise Exception(
+                    f"Arrays of unequal length cannot march together: {len(self.data)} and {len(other.data)}"
+                )
+            other_data = other.data
+        else:
+            kind_of(other)
+            other_data = other
+
+        left, right = (other_data, self.data) if reflected else (self.data, other_data)
+
+        if numpy is not None:
+            if kind != BOOL:
+                # NumPy treats bool + bool as logical or; count them as 0/1 instead
+                left = left.astype("int64") if getattr(left, "dtype", None) == bool else left
+                right = right.astype("int64") if getattr(right, "dtype", None) == bool else right
+            if kind == INT:
+                return NumArray(checked_int64(fn, left, right), kind)
+            return NumArray(fn(left, right).astype(DTYPES[kind], copy=False), kind)
+
+        if isinstance(left, array) and isinstance(right, array):
+            values = map(fn, left, right)
+        elif isinstance(left, array):
+            values = map(fn, left, repeat(right, len(left)))
+        else:
+            values = map(fn, repeat(left, len(right)), right)
+        values = list(values)
+        try:
+            return NumArray(array(TYPECODES[kind], values), kind)
+        except OverflowError:
+            raise too_large(next(v for v in values if not INT_MIN <= v <= INT_MAX)) from None
+
+    def arithmetic(self, fn, other, reflected=False):
+        other_kind = other.kind if isinstance(other, NumArray) else kind_of(other)
+        return self.elementwise(fn, other, reflected, max(self.kind, other_kind, INT))
+
+    def divide(self, other, reflected=False):
+        divisor = self if reflected else other
+        if isinstance(divisor, NumArray):
+            has_zero = (divisor.data == 0).any() if numpy is not None else 0 in divisor.data
+        else:
+            has_zero = divisor == 0
+        if has_zero:
+            raise ZeroDivisionError("Cannot divide by zero.")
+        return self.elementwise(operator.truediv, other, reflected, FLOAT)
+
+    def __add__(self, other):
+        return self.arithmetic(operator.add, other)
+
+    def __radd__(self, other):
+        return self.arithmetic(operator.add, other, reflected=True)
+
+    def __sub__(self, other):
+        return self.arithmetic(operator.sub, other)
+
+    def __rsub__(self, other):
+        return self.arithmetic(operator.sub, other, reflected=True)
+
+    def __mul__(self, other):
+        return self.arithmetic(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self.arithmetic(operator.mul, other, reflected=True)
+
+    def __truediv__(self, other):
+        return self.divide(other)
+
+    def __rtruediv__(self, other):
+        return self.divide(other, reflected=True)
+
+    def __neg__(self):
+        return self.arithmetic(operator.mul, -1)
+
+    # Python swaps the operands of reflected comparisons itself (5 < a -> a > 5)
+    def __eq__(self, other):
+        return self.elementwise(operator.eq, other, False, BOOL)
+
+    def __ne__(self, other):
+        return self.elementwise(operator.ne, other, False, BOOL)
+
+    def __lt__(self, other):
+        return self.elementwise(operator.lt, other, False, BOOL)
+
+    def __le__(self, other):
+        return self.elementwise(operator.le, other, False, BOOL)
+
+    def __gt__(self, other):
+        return self.elementwise(operator.gt, other, False, BOOL)
+
+    def __ge__(self, other):
+        return self.elementwise(operator.ge, other, False, BOOL)
+
+    def __bool__(self):
+        raise Exception("An array is neither true nor false; use any() or all().")
+
+    def __str__(self):
+        return "[" + ", ".join(map(str, self.tolist())) + "]"
+
+    def __repr__(self):
+        return f"NumArray({self})"
+
+
+class Map:
+    """
+    A hashed table value mapping numbers, strings or booleans to any value.
+    Lookups and stores are O(1); iteration follows insertion order.
+
+    Attributes:
+        items: The backing dict.
+    """
+
+    __slots__ = ("items",)
+
+    def __init__(self, items=None):
+        self.items = dict(items) if items else {}
+
+    def __getitem__(self, key):
+        return self.items[key]
+
+    def __setitem__(self, key, value):
+        self.items[key] = value
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __str__(self):
+        return "{" + ", ".join(f"{show(key)}: {show(value)}" for key, value in self.items.items()) + "}"
+
+    def __repr__(self):
+        return f"Map({self})"
+
+
+def show(value):
+    # Quote strings inside collections so {"1": 1} and {1: 1} print differently
+    return f'"{value}"' if isinstance(value, str) else str(value)
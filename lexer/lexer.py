@@ -1,4 +1,7 @@
 import re
+import sys
+from bisect import bisect_right
+from types import MappingProxyType
 
 # define our Tolkiens as constants
 TOLKIEN_TYPES = {
@@ -35,20 +38,29 @@ TOLKIEN_TYPES = {
     "FUN": "FUN",
     "RETURN": "RETURN",
     "COMMA": "COMMA",
+    "LBRACKET": "LBRACKET",
+    "RBRACKET": "RBRACKET",
+    "COLON": "COLON",
 }
 
 
 class Tolkien:
-    def __init__(self, type_, value=None):
+    # Slots keep every Tolkien small now that each one also carries a position
+    __slots__ = ("type", "value", "pos")
+
+    def __init__(self, type_, value=None, pos=None):
         self.type = type_
         self.value = value
+        # Character offset of the first character in the source, see SourceMap
+        self.pos = pos
 
     def __repr__(self):
         return f"Tolkien({self.type}, {repr(self.value)})"
 
 
-# Define Black Speech keywords
-BLACK_SPEECH_KEYWORDS = {
+# Define Black Speech keywords. The table is shared by every Lexer, in any
+# thread, so it is read-only and its Tolkiens are only used as templates.
+BLACK_SPEECH_KEYWORDS = MappingProxyType({
     "true": Tolkien(TOLKIEN_TYPES["BOOLEAN"], True),
     "false": Tolkien(TOLKIEN_TYPES["BOOLEAN"], False),
     "goth": Tolkien(TOLKIEN_TYPES["BOOLEAN"], True),
@@ -70,14 +82,59 @@ BLACK_SPEECH_KEYWORDS = {
     "arburz": Tolkien(TOLKIEN_TYPES["WHILE"], "arburz"),
     "fun": Tolkien(TOLKIEN_TYPES["FUN"], "fun"),
     "zagh": Tolkien(TOLKIEN_TYPES["RETURN"], "zagh"),
-}
+})
 
 
-class Lexer:
+# The rest of an identifier, from its first letter on
+WORD = re.compile(r"\w+")
+
+
+class SourceMap:
+    """
+    Turns the character offsets stored on Tolkiens and nodes into 1-based
+    (line, column) pairs. The index of line starts is only built the first
+    time a position is looked up, so it costs nothing for error-free runs.
+    """
+
     def __init__(self, text):
         self.text = text
-        self.pos = 0
-        self.current_char = self.text[self.pos] if self.text else None
+        self.line_starts = None
+
+    def line_col(self, offset):
+        if self.line_starts is None:
+            starts = [0]
+            find = self.text.find
+            index = find("\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = find("\n", index + 1)
+            self.line_starts = starts
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def describe(self, offset):
+        line, column = self.line_col(offset)
+        return f"line {line}, column {column}"
+
+
+def where(pos, source_map=None):
+    # " at line L, column C" (or " at offset N" without a SourceMap); "" if unknown
+    if pos is None:
+        return ""
+    if source_map is None:
+        return f" at offset {pos}"
+    return f" at {source_map.describe(pos)}"
+
+
+class Lexer:
+    def __init__(self, text, offset=0, start=0):
+        self.text = text
+        # Lexing may begin part way into text, without slicing it
+        self.pos = start
+        # Added to self.pos for Tolkien positions, when text is part of a larger source
+        self.offset = offset
+        self.source_map = SourceMap(text) if offset == 0 else None
+        self.current_char = self.text[self.pos] if self.pos < len(self.text) else None
 
     def advance(self):
         self.pos += 1
@@ -104,10 +161,14 @@ class Lexer:
 
     def string(self):
         result = ""
+        start = self.offset + self.pos
         self.advance()
         while self.current_char is not None and self.current_char != '"':
             if self.current_char == "\\":
                 self.advance()
+                if self.current_char is None:
+                    # A backslash at the very end leaves the string unclosed
+                    break
                 if self.current_char == "n":
                     result += "\n"
                 elif self.current_char == "t":
@@ -121,25 +182,37 @@ class Lexer:
             self.advance()
 
         if self.current_char != '"':
-            raise Exception("The way is open, close the string literal!")
+            raise Exception(
+                f"The way is open, close the string literal!{where(start, self.source_map)}"
+            )
         self.advance()
         return Tolkien(TOLKIEN_TYPES["STRING"], result)
 
     def identifier(self):
         """Handles identifiers (variables and keywords, including Black Speech)."""
-        result = ""
-        while self.current_char is not None and (
-            self.current_char.isalnum() or self.current_char == "_"
-        ):
-            result += self.current_char
-            self.advance()
+        # \w is exactly isalnum() or "_", so the name is sliced out in one go
+        end = WORD.match(self.text, self.pos).end()
+        result = self.text[self.pos:end]
+        self.pos = end
+        self.current_char = self.text[end] if end < len(self.text) else None
 
         # Check for Black Speech or standard keywords
-        return BLACK_SPEECH_KEYWORDS.get(
-            result, Tolkien(TOLKIEN_TYPES["IDENTIFIER"], result)
-        )
+        keyword = BLACK_SPEECH_KEYWORDS.get(result)
+        if keyword is not None:
+            # A fresh Tolkien, since each occurrence has its own position
+            return Tolkien(keyword.type, keyword.value)
+        # Every occurrence of a name shares one string, so Environment lookups
+        # of the same name hit on identity instead of comparing characters
+        return Tolkien(TOLKIEN_TYPES["IDENTIFIER"], sys.intern(result))
 
     def get_next_tolkien(self):
+        self.skip_whitecity_space()
+        start = self.offset + self.pos
+        tolkien = self.scan_tolkien()
+        tolkien.pos = start
+        return tolkien
+
+    def scan_tolkien(self):
         while self.current_char is not None:
 
             if self.current_char.isspace():
@@ -225,8 +298,101 @@ class Lexer:
                 self.advance()
                 return Tolkien(TOLKIEN_TYPES["RBRACE"], "}")
 
+            if self.current_char == "[":
+                self.advance()
+                return Tolkien(TOLKIEN_TYPES["LBRACKET"], "[")
+            if self.current_char == "]":
+                self.advance()
+                return Tolkien(TOLKIEN_TYPES["RBRACKET"], "]")
+
+            if self.current_char == ":":
+                self.advance()
+                return Tolkien(TOLKIEN_TYPES["COLON"], ":")
+
             raise Exception(
                 f"The Nine are abroad, this is not part of the Fellowship: {self.current_char}"
+                f"{where(self.offset + self.pos, self.source_map)}"
             )
 
         return Tolkien(TOLKIEN_TYPES["EOF"], None)
+
+
+class StreamingLexer(Lexer):
+    """
+    Lexer that reads its source from a file object in chunks rather than
+    holding the whole program as one string. Only the unconsumed tail of
+    the current chunk is kept, so memory stays flat for very large scripts.
+    """
+
+    def __init__(self, file, chunk_size=1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.exhausted = False
+        self.text = ""
+        self.pos = 0
+        # The whole source is never held, so errors report offsets only
+        self.offset = 0
+        self.source_map = None
+        self.fill()
+        self.current_char = self.text[self.pos] if self.text else None
+
+    def fill(self):
+        # Drop the consumed prefix and append the next chunk from the file
+        if self.exhausted:
+            return
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.exhausted = True
+        self.text = self.text[self.pos:] + chunk
+        self.offset += self.pos
+        self.pos = 0
+
+    def advance(self):
+        self.pos += 1
+        # Keep at least one character of lookahead buffered for peek()
+        if self.pos + 1 >= len(self.text):
+            self.fill()
+        self.current_char = self.text[self.pos] if self.pos < len(self.text) else None
+
+    def identifier(self):
+        # Buffer the whole identifier before it is sliced out of the chunk
+        while not self.exhausted and WORD.match(self.text, self.pos).end() == len(self.text):
+            self.fill()
+        return super().identifier()
+
+    def peek(self):
+        peek_pos = self.pos + 1
+        if peek_pos >= len(self.text):
+            self.fill()
+            peek_pos = self.pos + 1
+        return self.text[peek_pos] if peek_pos < len(self.text) else None
+
+
+class TolkienStream:
+    """
+    Replays an already lexed list of Tolkiens through the same
+    get_next_tolkien() interface as Lexer, so a Parser can run over tokens
+    without lexing again (e.g. to time parsing on its own).
+    """
+
+    def __init__(self, tolkiens, source_map=None):
+        self.tolkiens = tolkiens
+        self.index = 0
+        self.source_map = source_map
+
+    def get_next_tolkien(self):
+        if self.index < len(self.tolkiens):
+            tolkien = self.tolkiens[self.index]
+            self.index += 1
+            return tolkien
+        return Tolkien(TOLKIEN_TYPES["EOF"], None)
+
+
+def tokenize(lexer):
+    """Drain a lexer into a list of Tolkiens, ending with the EOF Tolkien."""
+    tolkiens = []
+    while True:
+        tolkien = lexer.get_next_tolkien()
+        tolkiens.append(tolkien)
+        if tolkien.type == TOLKIEN_TYPES["EOF"]:
+            return tolkiens
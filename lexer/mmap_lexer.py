@@ -0,0 +1,194 @@
+import mmap
+import re
+import sys
+from bisect import bisect_right
+
+from lexer.lexer import BLACK_SPEECH_KEYWORDS, TOLKIEN_TYPES, SourceMap, Tolkien, where
+
+# One match per Tolkien over the raw bytes: leading whitespace, then a
+# number, a word, a string literal or an operator. The byte classes are the
+# ASCII members of the str methods Lexer uses (isspace, isdigit, isalpha,
+# isalnum); anything non-ASCII outside a string literal is handled by
+# MmapLexer.unicode_tolkien().
+TOLKIEN_PATTERN = re.compile(
+    rb"""
+    [\t\n\x0b\x0c\r\x1c-\x1f ]*
+    (?:
+        (?P<NUMBER>[0-9][0-9.]*)
+      | (?P<WORD>[A-Za-z][A-Za-z0-9_]*)
+      | (?P<STRING>"[^"\\]*(?:\\.[^"\\]*)*")
+      | (?P<OPERATOR>==|!=|<=|>=|[=!<>+\-*/(),;{}\[\]:])
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+WHITESPACE = re.compile(rb"[\t\n\x0b\x0c\r\x1c-\x1f ]*")
+# A run of bytes that may belong to a non-ASCII identifier; it always ends on
+# an ASCII byte, so it never splits a UTF-8 sequence.
+WORD_BYTES = re.compile(rb"[A-Za-z0-9_\x80-\xff]+")
+ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+ESCAPES = {"n": "\n", "t": "\t"}
+
+OPERATORS = {
+    b"==": (TOLKIEN_TYPES["EQ"], "=="),
+    b"=": (TOLKIEN_TYPES["EQUALS"], "="),
+    b"!=": (TOLKIEN_TYPES["NEQ"], "!="),
+    b"!": (TOLKIEN_TYPES["NOT"], "not"),
+    b"<=": (TOLKIEN_TYPES["LTE"], "<="),
+    b"<": (TOLKIEN_TYPES["LT"], "<"),
+    b">=": (TOLKIEN_TYPES["GTE"], ">="),
+    b">": (TOLKIEN_TYPES["GT"], ">"),
+    b"+": (TOLKIEN_TYPES["PLUS"], "+"),
+    b"-": (TOLKIEN_TYPES["MINUS"], "-"),
+    b"*": (TOLKIEN_TYPES["MULTI"], "*"),
+    b"/": (TOLKIEN_TYPES["DIV"], "/"),
+    b"(": (TOLKIEN_TYPES["LPAREN"], "("),
+    b")": (TOLKIEN_TYPES["RPAREN"], ")"),
+    b",": (TOLKIEN_TYPES["COMMA"], ","),
+    b";": (TOLKIEN_TYPES["SEMI"], ";"),
+    b"{": (TOLKIEN_TYPES["LBRACE"], "{"),
+    b"}": (TOLKIEN_TYPES["RBRACE"], "}"),
+    b"[": (TOLKIEN_TYPES["LBRACKET"], "["),
+    b"]": (TOLKIEN_TYPES["RBRACKET"], "]"),
+    b":": (TOLKIEN_TYPES["COLON"], ":"),
+}
+
+# Pages already lexed are handed back to the OS in steps of this many bytes,
+# so resident memory stays flat however large the mapped file is.
+RELEASE_STEP = 1 << 24
+
+
+class ByteSourceMap(SourceMap):
+    """
+    SourceMap over UTF-8 bytes: positions are byte offsets, and columns are
+    counted in characters by decoding the start of the line.
+    """
+
+    def line_col(self, offset):
+        if self.line_starts is None:
+            starts = [0]
+            find = self.text.find
+            index = find(b"\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = find(b"\n", index + 1)
+            self.line_starts = starts
+        line = bisect_right(self.line_starts, offset)
+        start = self.line_starts[line - 1]
+        column = len(self.text[start:offset].decode("utf-8", errors="replace"))
+        return line, column + 1
+
+
+class MmapLexer:
+    """
+    Lexer over a memory-mapped UTF-8 (or ASCII) source file. Tolkiens are
+    matched on the raw bytes and only string literals and identifiers are
+    decoded, so the program is never held as one str. It produces the
+    same Tolkiens as Lexer, except that positions are byte offsets; the
+    ByteSourceMap still reports line and column in characters.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            try:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                self.data = b""
+        self.pos = 0
+        self.released = 0
+        self.source_map = ByteSourceMap(self.data)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_next_tolkien(self):
+        data = self.data
+        match = TOLKIEN_PATTERN.match(data, self.pos)
+        if match is None:
+            return self.fallback_tolkien()
+        kind = match.lastgroup
+        start = match.start(kind)
+        end = match.end()
+        if kind == "WORD":
+            if end < len(data) and data[end] >= 0x80:
+                # The identifier carries on past ASCII
+                return self.unicode_tolkien(start)
+            word = match.group(kind).decode("ascii")
+            keyword = BLACK_SPEECH_KEYWORDS.get(word)
+            if keyword is not None:
+                tolkien = Tolkien(keyword.type, keyword.value, start)
+            else:
+                tolkien = Tolkien(TOLKIEN_TYPES["IDENTIFIER"], sys.intern(word), start)
+        elif kind == "OPERATOR":
+            tolkien = Tolkien(*OPERATORS[match.group(kind)], start)
+        elif kind == "NUMBER":
+            text = match.group(kind).decode("ascii")
+            value = float(text) if "." in text else int(text)
+            tolkien = Tolkien(TOLKIEN_TYPES["NUMBER"], value, start)
+        else:
+            body = data[start + 1 : end - 1].decode("utf-8")
+            if "\\" in body:
+                body = ESCAPE.sub(lambda m: ESCAPES.get(m.group(1), m.group(1)), body)
+            tolkien = Tolkien(TOLKIEN_TYPES["STRING"], body, start)
+        self.pos = end
+        if end - self.released >= RELEASE_STEP:
+            self.release(end)
+        return tolkien
+
+    def fallback_tolkien(self):
+        # End of input, an unclosed string, an unknown character or non-ASCII text
+        data = self.data
+        start = WHITESPACE.match(data, self.pos).end()
+        self.pos = start
+        if start >= len(data):
+            return Tolkien(TOLKIEN_TYPES["EOF"], None, start)
+        if data[start] == ord('"'):
+            raise Exception(
+                f"The way is open, close the string literal!{where(start, self.source_map)}"
+            )
+        if data[start] >= 0x80:
+            return self.unicode_tolkien(start)
+        raise Exception(
+            f"The Nine are abroad, this is not part of the Fellowship: {chr(data[start])}"
+            f"{where(start, self.source_map)}"
+        )
+
+    def unicode_tolkien(self, start):
+        # Decode the run of word bytes at start and apply Lexer's str rules to it
+        run = WORD_BYTES.match(self.data, start)
+        text = self.data[start : run.end()].decode("utf-8")
+        char = text[0]
+        if char.isspace():
+            self.pos = start + len(char.encode("utf-8"))
+            return self.get_next_tolkien()
+        if not char.isalpha():
+            raise Exception(
+                f"The Nine are abroad, this is not part of the Fellowship: {char}"
+                f"{where(start, self.source_map)}"
+            )
+        length = 1
+        while length < len(text) and (text[length].isalnum() or text[length] == "_"):
+            length += 1
+        word = text[:length]
+        self.pos = start + len(word.encode("utf-8"))
+        keyword = BLACK_SPEECH_KEYWORDS.get(word)
+        if keyword is not None:
+            return Tolkien(keyword.type, keyword.value, start)
+        return Tolkien(TOLKIEN_TYPES["IDENTIFIER"], sys.intern(word), start)
+
+    def release(self, end):
+        # Drop lexed pages from resident memory; they are re-read if an error needs them
+        if not hasattr(mmap, "MADV_DONTNEED") or not isinstance(self.data, mmap.mmap):
+            return
+        page_end = end - end % mmap.PAGESIZE
+        if page_end > self.released:
+            self.data.madvise(mmap.MADV_DONTNEED, self.released, page_end - self.released)
+            self.released = page_end
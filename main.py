@@ -1,8 +1,117 @@
-from lexer.lexer import Lexer
+import argparse
+import os
+import sys
+import time
+
+from lexer.lexer import Lexer, SourceMap, StreamingLexer
+from lexer.mmap_lexer import MmapLexer
 from parser.parser import Parser
-from interpreter.interpreter import Interpreter
+from interpreter.interpreter import Environment, Interpreter
+from optimizer.optimizer import Optimizer, optimize
+from parser.incremental import IncrementalParser
+from embedding.program import copy_globals
+from embedding.snapshot import run_prelude, warm_start
+from instrumentation.stats import RunStats, CountingInterpreter, parse_with_stats
+from instrumentation.coverage import Coverage, CoverageInterpreter
+
+def watch(file_path, prelude_env=None, interval=0.25):
+    # Rerun the program whenever the file changes, reparsing only what was edited
+    incremental = None
+    last_modified = None
+    while True:
+        modified = os.stat(file_path).st_mtime_ns
+        if modified != last_modified:
+            last_modified = modified
+            with open(file_path, 'r') as file:
+                code = file.read()
+            start = time.perf_counter()
+            try:
+                if incremental is None:
+                    incremental = IncrementalParser(code)
+                    reparsed = len(incremental.segments)
+                else:
+                    reparsed = incremental.set_source(code)
+                statements = incremental.statements()
+            except Exception as e:
+                # Keep the last good tree; the next save is diffed against it
+                print(e, file=sys.stderr)
+            else:
+                elapsed = (time.perf_counter() - start) * 1000
+                print(
+                    f"--- reparsed {reparsed} of {len(statements)} statements"
+                    f" in {elapsed:.1f} ms ---",
+                    file=sys.stderr,
+                )
+                # Each rerun starts from a fresh copy of the prelude's globals
+                env = Environment()
+                if prelude_env is not None:
+                    env.values.update(copy_globals(prelude_env.values))
+                try:
+                    Interpreter(env=env, source_map=incremental.source_map).execute(statements)
+                except Exception as e:
+                    print(e, file=sys.stderr)
+        time.sleep(interval)
+
+def load_prelude(prelude_path, snapshot_path=None):
+    # Global Environment after the prelude, restored from the snapshot when it is current
+    with open(prelude_path, 'r') as file:
+        prelude = file.read()
+    if snapshot_path is not None:
+        return warm_start(snapshot_path, prelude)
+    return run_prelude(prelude)
+
+def main(
+    file_path, stream=False, stats=False, prelude=None, snapshot=None, use_mmap=False, coverage=None
+):
+    env = load_prelude(prelude, snapshot) if prelude is not None else None
+
+    if coverage is not None:
+        # Count runs per node; unoptimized, so every if/elif condition is reported
+        with open(file_path, 'r') as file:
+            code = file.read()
+        statements = Parser(Lexer(code)).parse()
+        counters = Coverage(statements, SourceMap(code))
+        try:
+            CoverageInterpreter(counters, source_map=counters.source_map).execute(statements)
+        finally:
+            print(counters.annotate(code), file=sys.stderr)
+            print(counters.summary(), file=sys.stderr)
+            counters.write_json(coverage)
+        return counters
+
+    if stats:
+        # Time each phase on its own and report counters on stderr
+        with open(file_path, 'r') as file:
+            code = file.read()
+        run_stats = RunStats()
+        ast = optimize(parse_with_stats(code, run_stats))
+        try:
+            CountingInterpreter(run_stats, env=env, source_map=SourceMap(code)).execute(ast)
+        finally:
+            print(run_stats.report(), file=sys.stderr)
+        return run_stats
+
+    if use_mmap:
+        # Lex straight from a memory map of the file instead of reading it into a str
+        with MmapLexer(file_path) as lexer:
+            parser = Parser(lexer)
+            interpreter = Interpreter(env=env, source_map=lexer.source_map)
+            if stream:
+                optimizer = Optimizer()
+                interpreter.execute(optimizer.visit(stmt) for stmt in parser.program_stream())
+            else:
+                interpreter.execute(optimize(parser.parse()))
+        return
+
+    if stream:
+        # Lex, parse and run one top-level statement at a time
+        with open(file_path, 'r') as file:
+            parser = Parser(StreamingLexer(file))
+            optimizer = Optimizer()
+            statements = (optimizer.visit(stmt) for stmt in parser.program_stream())
+            Interpreter(env=env).execute(statements)
+        return
 
-def main(file_path):
     # Read the source code
     with open(file_path, 'r') as file:
         code = file.read()
@@ -12,16 +121,77 @@ def main(file_path):
     # Parse the lexed tokens
     parser = Parser(lexer)
     # Parse the source code
-    ast = parser.parse()
+    ast = optimize(parser.parse())
     # Interpret
-    interpreter = Interpreter()
+    interpreter = Interpreter(env=env, source_map=lexer.source_map)
     # Visit the AST
-    for i, expr in enumerate(ast, 1):
-        interpreter.visit(expr)
+    interpreter.execute(ast)
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) != 2:
-        print("Usage: python src/main.py <source_file.mordor>")
-    else:
-        main(sys.argv[1])
+    arg_parser = argparse.ArgumentParser(description="Run a MordorLang program.")
+    arg_parser.add_argument("source_file", help="path to a .mordor source file")
+    arg_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="execute each top-level statement as soon as it is parsed",
+    )
+    arg_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="report lex/parse/execute timings and counters on stderr",
+    )
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="rerun the program each time the file is saved",
+    )
+    arg_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="lex from a memory map of the file (for very large generated scripts)",
+    )
+    arg_parser.add_argument(
+        "--coverage",
+        metavar="FILE",
+        help="count how often each line, branch and loop ran; annotated source "
+        "goes to stderr and the counts to FILE as JSON",
+    )
+    arg_parser.add_argument(
+        "--prelude",
+        metavar="FILE",
+        help="run this setup file first; its definitions are visible to the program",
+    )
+    arg_parser.add_argument(
+        "--snapshot",
+        metavar="FILE",
+        help="save the state after --prelude here and restore it on later runs",
+    )
+    args = arg_parser.parse_args()
+    if args.stats and args.stream:
+        arg_parser.error("--stats times whole phases and cannot be combined with --stream")
+    if args.watch and (args.stats or args.stream or args.mmap):
+        arg_parser.error("--watch cannot be combined with --stats, --stream or --mmap")
+    if args.mmap and args.stats:
+        arg_parser.error("--stats times lexing a str and cannot be combined with --mmap")
+    if args.coverage and (args.stats or args.stream or args.watch or args.mmap or args.prelude):
+        arg_parser.error("--coverage cannot be combined with other run modes or --prelude")
+    if args.snapshot and not args.prelude:
+        arg_parser.error("--snapshot needs a --prelude to snapshot")
+    if args.watch:
+        try:
+            prelude_env = None
+            if args.prelude:
+                prelude_env = load_prelude(args.prelude, args.snapshot)
+            watch(args.source_file, prelude_env)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+    main(
+        args.source_file,
+        stream=args.stream,
+        stats=args.stats,
+        prelude=args.prelude,
+        snapshot=args.snapshot,
+        use_mmap=args.mmap,
+        coverage=args.coverage,
+    )
@@ -0,0 +1,98 @@
+from abstract_syntax_tree.nodes import (
+    Number,
+    Boolean,
+    String,
+    UnaryOp,
+    CompareOp,
+    Var,
+    If,
+    Switch,
+)
+
+# constant_value() of anything that is not a constant
+NOT_CONSTANT = object()
+
+# Shorter if/elif chains are cheap enough to test one condition at a time
+JUMP_TABLE_MIN_CASES = 4
+
+
+class Optimizer:
+    """
+    Compile-time rewrites of the statement list produced by Parser, applied
+    before the Interpreter sees it. Nodes are rewritten in place where they
+    hold child statements; the result behaves exactly like the input.
+
+    Currently:
+        - if/elif chains comparing one variable with distinct constants
+          become a Switch jump table.
+    """
+
+    def optimize(self, statements):
+        return [self.visit(statement) for statement in statements]
+
+    def visit(self, node):
+        visitor = getattr(self, f"visit_{type(node).__name__}", None)
+        return visitor(node) if visitor is not None else node
+
+    def visit_Block(self, node):
+        node.statements = [self.visit(statement) for statement in node.statements]
+        return node
+
+    def visit_While(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Fun(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_If(self, node):
+        # Collect the leading links of the chain shaped like "var == constant"
+        var_name = None
+        chain = []
+        current = node
+        while isinstance(current, If):
+            case = self.constant_case(current.condition)
+            if case is None or (var_name is not None and case[0] != var_name):
+                break
+            var_name = case[0]
+            chain.append((case[1], current.then_branch))
+            current = current.else_branch
+
+        if len(chain) < JUMP_TABLE_MIN_CASES:
+            node.then_branch = self.visit(node.then_branch)
+            if node.else_branch is not None:
+                node.else_branch = self.visit(node.else_branch)
+            return node
+
+        cases = {}
+        for constant, branch in chain:
+            # The first of equal constants (1, 1.0, true) wins, as in the chain
+            if constant not in cases:
+                cases[constant] = self.visit(branch)
+        # Whatever follows the matched links (else block or rest of chain)
+        default = self.visit(current) if current is not None else None
+        return Switch(var_name, cases, default, node, pos=node.pos)
+
+    def constant_case(self, condition):
+        # (name, constant) for "name == constant" or "constant == name", else None
+        if not isinstance(condition, CompareOp) or condition.op != "==":
+            return None
+        for var, other in ((condition.left, condition.right), (condition.right, condition.left)):
+            if isinstance(var, Var):
+                constant = self.constant_value(other)
+                if constant is not NOT_CONSTANT:
+                    return (var.var_name, constant)
+        return None
+
+    def constant_value(self, node):
+        if isinstance(node, (Number, String, Boolean)):
+            return node.value
+        if isinstance(node, UnaryOp) and node.op == "-" and isinstance(node.operand, Number):
+            return -node.operand.value
+        return NOT_CONSTANT
+
+
+def optimize(statements):
+    """Run every Optimizer pass over a list of top-level statements."""
+    return Optimizer().optimize(statements)
@@ -0,0 +1,185 @@
+from bisect import bisect_right
+
+from lexer.lexer import Lexer, SourceMap, Tolkien
+from parser.parser import Parser
+
+
+class RecordingLexer:
+    # Passes Tolkiens through to the Parser while keeping a copy of each one
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.source_map = lexer.source_map
+        self.tolkiens = []
+
+    def get_next_tolkien(self):
+        tolkien = self.lexer.get_next_tolkien()
+        self.tolkiens.append(tolkien)
+        return tolkien
+
+
+class TranslatedSourceMap(SourceMap):
+    # A SourceMap for positions that have to be translated to offsets in text first
+    def __init__(self, text, translate):
+        super().__init__(text)
+        self.translate = translate
+
+    def line_col(self, offset):
+        return super().line_col(self.translate(offset))
+
+
+class Segment:
+    """
+    One top-level statement with the Tolkiens it was parsed from. A segment
+    runs from its first Tolkien up to the first Tolkien of the next one, so
+    the whitespace after a statement belongs to it.
+
+    Attributes:
+        base: The position of the segment's start in the coordinates its
+              Tolkiens and nodes were given when it was parsed. Every
+              position inside it is base plus an offset into the segment.
+              Bases are never reused, so a position also tells which
+              segment it came from.
+        tolkiens: The segment's Tolkiens, ending with its SEMI.
+        statement: The parsed top-level statement.
+    """
+
+    __slots__ = ("base", "tolkiens", "statement")
+
+    def __init__(self, base, tolkiens, statement):
+        self.base = base
+        self.tolkiens = tolkiens
+        self.statement = statement
+
+
+class IncrementalParser:
+    """
+    Keeps the source, Tolkiens and tree of a program and updates them for
+    text edits. Only the top-level statements touched by an edit are
+    lexed and parsed again. Parsing stops as soon as a statement boundary
+    lines up with an old one past the edit, and every statement from there
+    on is reused as it is.
+
+    Tolkiens and nodes keep the positions they were parsed with, relative
+    to their segment's base, so an edit only moves segment starts and never
+    touches the rest of the tree. Positions are turned into offsets in the
+    current source when they are read: through source_map for lines and
+    columns, offset() for a single position, and tolkiens().
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.segments = []
+        # starts[i] is the current source offset of segments[i]
+        self.starts = []
+        # The first position not yet handed out to any segment
+        self.extent = 0
+        self.segments, self.starts, _ = self.parse_from(source, 0, None)
+        self.source_map = TranslatedSourceMap(source, self.offset)
+
+    def parse_from(self, source, offset, resync):
+        """
+        Parse top-level statements of `source` from `offset`. `resync(b)`
+        returns the index of an old segment starting at new offset b, or None;
+        parsing stops at the first boundary it accepts. Returns the new
+        segments, their starts and the old index to resume from.
+        """
+        # Positions continue from the last segment parsed, whatever its offset
+        shift = self.extent - offset
+        self.extent = shift + len(source) + 1
+        lexer = Lexer(source, offset=shift, start=offset)
+        # Report errors in lines and columns of the whole source
+        lexer.source_map = TranslatedSourceMap(source, lambda pos: pos - shift)
+        lexer = RecordingLexer(lexer)
+        parser = Parser(lexer)
+        segments = []
+        starts = []
+        start = offset
+        for statement in parser.program_stream():
+            boundary = parser.current_tolkien.pos
+            # Tolkiens before the boundary belong to this statement; at most
+            # the lookahead Tolkien(s) after it have been read already.
+            taken = [t for t in lexer.tolkiens if t.pos < boundary]
+            lexer.tolkiens = lexer.tolkiens[len(taken):]
+            segments.append(Segment(start + shift, taken, statement))
+            starts.append(start)
+            start = boundary - shift
+            if resync is not None and parser.current_tolkien.type != "EOF":
+                resume = resync(start)
+                if resume is not None:
+                    return segments, starts, resume
+        return segments, starts, len(self.segments)
+
+    def edit(self, start, end, text):
+        """
+        Replace source[start:end] with `text` and update the tree. Returns
+        the number of top-level statements that were parsed again. If the
+        new text does not parse, the exception propagates and nothing changes.
+        """
+        source = self.source[:start] + text + self.source[end:]
+        delta = len(text) - (end - start)
+        edit_end = start + len(text)
+        old_starts = self.starts
+
+        # First segment the edit can touch; step back one when the edit sits
+        # on a boundary, since it may change how the previous statement ends.
+        first = max(bisect_right(old_starts, start) - 1, 0)
+        if first > 0 and start == old_starts[first]:
+            first -= 1
+        offset = old_starts[first] if first > 0 else 0
+
+        def resync(boundary):
+            # An old statement boundary past the edit means the rest is unchanged
+            if boundary < edit_end:
+                return None
+            old = boundary - delta
+            index = bisect_right(old_starts, old) - 1
+            if index > first and old_starts[index] == old and old >= end:
+                return index
+            return None
+
+        segments, starts, resume = self.parse_from(source, offset, resync)
+
+        self.source = source
+        self.segments[first:resume] = segments
+        self.starts = old_starts[:first] + starts + [s + delta for s in old_starts[resume:]]
+        self.source_map = TranslatedSourceMap(source, self.offset)
+        return len(segments)
+
+    def set_source(self, source):
+        """Update to a whole new source text by diffing it against the current one."""
+        old = self.source
+        if source == old:
+            return 0
+        limit = min(len(old), len(source))
+        prefix = 0
+        while prefix < limit and old[prefix] == source[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == source[-1 - suffix]:
+            suffix += 1
+        return self.edit(prefix, len(old) - suffix, source[prefix : len(source) - suffix])
+
+    def offset(self, pos):
+        """
+        The offset in the current source of a position on a Tolkien or node
+        from this parser. Looking up the segment is linear, but positions are
+        only read for error messages and tools, never while a program runs.
+        """
+        index = None
+        for i, segment in enumerate(self.segments):
+            if segment.base <= pos and (index is None or segment.base > self.segments[index].base):
+                index = i
+        if index is None:
+            return pos
+        return self.starts[index] + pos - self.segments[index].base
+
+    def statements(self):
+        # Node positions are read through source_map, e.g. by an Interpreter given it
+        return [segment.statement for segment in self.segments]
+
+    def tolkiens(self):
+        return [
+            Tolkien(tolkien.type, tolkien.value, start + tolkien.pos - segment.base)
+            for segment, start in zip(self.segments, self.starts)
+            for tolkien in segment.tolkiens
+        ]
@@ -1,4 +1,4 @@
-from lexer.lexer import Lexer
+from lexer.lexer import Lexer, where
 from abstract_syntax_tree.nodes import (
     Number,
     BinaryOp,
@@ -17,26 +17,46 @@ from abstract_syntax_tree.nodes import (
     Block,
     Fun,
     FunctionCall,
+    ArrayLiteral,
+    Index,
+    IndexAssign,
+    MapLiteral,
 )
+from abstract_syntax_tree.tail_calls import mark_tail_calls
 
 
 class Parser:
     # The Parser reads Tolkiens from the Lexer and constructs an Abstract Syntax Tree (AST).
     def __init__(self, lexer: Lexer):
         self.lexer = lexer
+        # Turns Tolkien offsets into line/column for error messages, when available
+        self.source_map = getattr(lexer, "source_map", None)
         self.current_tolkien = lexer.get_next_tolkien()
+        # One Tolkien of lookahead, filled on demand by peek_tolkien()
+        self.next_tolkien = None
 
     def error(self, expected):
         raise Exception(
             f"You speak with the charmed tongue of Saruman: Expected {expected}, but got {self.current_tolkien}"
+            f"{where(self.current_tolkien.pos, self.source_map)}"
         )
 
     def eat(self, tolkien_type):
         if self.current_tolkien.type == tolkien_type:
-            self.current_tolkien = self.lexer.get_next_tolkien()
+            if self.next_tolkien is not None:
+                self.current_tolkien = self.next_tolkien
+                self.next_tolkien = None
+            else:
+                self.current_tolkien = self.lexer.get_next_tolkien()
         else:
             self.error(tolkien_type)
 
+    def peek_tolkien(self):
+        # Look at the Tolkien after the current one without consuming anything
+        if self.next_tolkien is None:
+            self.next_tolkien = self.lexer.get_next_tolkien()
+        return self.next_tolkien
+
     def parse(self):
         node = self.program()
         if self.current_tolkien.type != "EOF":
@@ -49,12 +69,18 @@ class Parser:
 
     def program(self):
         # program -> (statement SEMI)* EOF
-        statements = []
+        return list(self.program_stream())  # or wrap with a Block node if desired
+
+    def program_stream(self):
+        """
+        Yield top-level statements one at a time as they are parsed, so the
+        caller can execute and drop each one before the next is read.
+        Note that statements run before a later syntax error is reported.
+        """
         while self.current_tolkien.type != "EOF":
             stmt = self.statement()
             self.eat("SEMI")  # Every statement ends with a semicolon
-            statements.append(stmt)
-        return statements  # or wrap with a Block node if desired
+            yield stmt
 
     def statement(self):
         # Distinguish different statement types based on the current token.
@@ -93,10 +119,11 @@ class Parser:
         or just a variable reference as an expression statement.
         """
         name = self.current_tolkien.value
+        pos = self.current_tolkien.pos
         # Peek the next token to see if it is '=' or '(' or something else
-        peeked = self.lexer.peek()
+        peeked = self.peek_tolkien()
 
-        if peeked == "=":
+        if peeked.type == "EQUALS":
             # It's assignment
             return self.assignment()
 
@@ -108,13 +135,18 @@ class Parser:
         if self.current_tolkien.type == "LPAREN":
             # It's a function call
             args = self.argument_list()
-            return FunctionCall(name, args)
+            return FunctionCall(name, args, pos=pos)
+        elif self.current_tolkien.type == "LBRACKET":
+            # Element access, or element assignment like "a[i] = expr;"
+            node = self.subscripts(Var(name, pos=pos))
+            if self.current_tolkien.type == "EQUALS":
+                self.eat("EQUALS")
+                return IndexAssign(node.target, node.index, self.logical_expr(), pos=node.pos)
+            return node
         else:
             # It's just a variable reference used as an expression statement
             # e.g. "x;" in the code
-            from abstract_syntax_tree.nodes import Var
-
-            return Var(name)
+            return Var(name, pos=pos)
 
     # --------------------------
     #     Specific Statements
@@ -123,16 +155,18 @@ class Parser:
     def assignment(self):
         # assignment -> IDENTIFIER '=' logical_expr
         var_name = self.current_tolkien.value
+        pos = self.current_tolkien.pos
         self.eat("IDENTIFIER")
         self.eat("EQUALS")
         value = self.logical_expr()
-        return Assign(var_name, value)
+        return Assign(var_name, value, pos=pos)
 
     def fun_statement(self):
         """
         fun_statement -> FUN IDENTIFIER LPAREN (IDENTIFIER (COMMA IDENTIFIER)*)? RPAREN block
         Creates a 'Fun' or 'FunctionDef' node. Here we keep 'Fun' as you have in your code.
         """
+        pos = self.current_tolkien.pos
         self.eat("FUN")
         fun_name = self.current_tolkien.value
         self.eat("IDENTIFIER")
@@ -149,22 +183,27 @@ class Parser:
         self.eat("RPAREN")
 
         body = self.block()
-        return Fun(fun_name, parameters, body)
+        fun = Fun(fun_name, parameters, body, pos=pos)
+        # Marked here rather than in the optimizer, so every run mode eliminates tail calls
+        mark_tail_calls(fun)
+        return fun
 
     def return_statement(self):
         # return_statement -> RETURN ( logical_expr )?
+        pos = self.current_tolkien.pos
         self.eat("RETURN")
         from abstract_syntax_tree.nodes import Return
 
         # If the next token is a semicolon, '}', or EOF, there's no return value
         if self.current_tolkien.type in ("SEMI", "RBRACE", "EOF"):
-            return Return(None)
+            return Return(None, pos=pos)
         else:
             expr = self.logical_expr()
-            return Return(expr)
+            return Return(expr, pos=pos)
 
     def if_statement(self):
         # if_statement -> IF ( logical_expr )? block if_statement_tail?
+        pos = self.current_tolkien.pos
         self.eat("IF")
         # Optional parentheses around condition
         if self.current_tolkien.type == "LPAREN":
@@ -177,11 +216,12 @@ class Parser:
         then_branch = self.block()
         else_branch = self.if_statement_tail()
 
-        return If(condition, then_branch, else_branch)
+        return If(condition, then_branch, else_branch, pos=pos)
 
     def if_statement_tail(self):
         # if_statement_tail -> (ELIF ( ( logical_expr )? block ) | ELSE block )?
         if self.current_tolkien.type == "ELIF":
+            pos = self.current_tolkien.pos
             self.eat("ELIF")
             if self.current_tolkien.type == "LPAREN":
                 self.eat("LPAREN")
@@ -192,7 +232,7 @@ class Parser:
 
             then_branch = self.block()
             else_branch = self.if_statement_tail()
-            return If(condition, then_branch, else_branch)
+            return If(condition, then_branch, else_branch, pos=pos)
 
         elif self.current_tolkien.type == "ELSE":
             self.eat("ELSE")
@@ -202,6 +242,7 @@ class Parser:
 
     def while_statement(self):
         # while_statement -> WHILE ( logical_expr )? block
+        pos = self.current_tolkien.pos
         self.eat("WHILE")
         if self.current_tolkien.type == "LPAREN":
             self.eat("LPAREN")
@@ -211,10 +252,11 @@ class Parser:
             condition = self.logical_expr()
 
         body = self.block()
-        return While(condition, body)
+        return While(condition, body, pos=pos)
 
     def print_statement(self):
         # print_statement -> PRINT expr | PRINT LPAREN expr RPAREN
+        pos = self.current_tolkien.pos
         self.eat("PRINT")
 
         if self.current_tolkien.type == "LPAREN":
@@ -222,15 +264,14 @@ class Parser:
             expr = self.logical_expr()
             self.eat("RPAREN")
         else:
-            if self.current_tolkien.type == "IDENTIFIER":
-                expr = self.variable_reference()
-            else:
-                expr = self.logical_expr()
+            # A whole expression, so "krimp a[0];" and "krimp x + 1;" work as in parentheses
+            expr = self.logical_expr()
 
-        return Print(expr)
+        return Print(expr, pos=pos)
 
     def block(self):
         # block -> LBRACE (statement (SEMI)?)* RBRACE
+        pos = self.current_tolkien.pos
         self.eat("LBRACE")
         statements = []
         while self.current_tolkien.type != "RBRACE":
@@ -243,7 +284,7 @@ class Parser:
                 self.error("SEMI or RBRACE")
 
         self.eat("RBRACE")
-        return Block(statements)
+        return Block(statements, pos=pos)
 
     # ---------------------------------
     #         Function Calls
@@ -278,7 +319,7 @@ class Parser:
             op_token = self.current_tolkien
             self.eat(op_token.type)
             right = self.comparison()
-            node = LogicalOp(left=node, op=op_token.value, right=right)
+            node = LogicalOp(left=node, op=op_token.value, right=right, pos=op_token.pos)
         return node
 
     def comparison(self):
@@ -288,7 +329,7 @@ class Parser:
             op_token = self.current_tolkien
             self.eat(op_token.type)
             right = self.expr()
-            node = CompareOp(left=node, op=op_token.value, right=right)
+            node = CompareOp(left=node, op=op_token.value, right=right, pos=op_token.pos)
         return node
 
     def expr(self):
@@ -298,7 +339,7 @@ class Parser:
             op_token = self.current_tolkien
             self.eat(op_token.type)
             right = self.term()
-            node = BinaryOp(left=node, op=op_token.value, right=right)
+            node = BinaryOp(left=node, op=op_token.value, right=right, pos=op_token.pos)
         return node
 
     def term(self):
@@ -308,7 +349,7 @@ class Parser:
             op_token = self.current_tolkien
             self.eat(op_token.type)
             right = self.unary_expr()
-            node = BinaryOp(left=node, op=op_token.value, right=right)
+            node = BinaryOp(left=node, op=op_token.value, right=right, pos=op_token.pos)
         return node
 
     def unary_expr(self):
@@ -317,24 +358,38 @@ class Parser:
             op_token = self.current_tolkien
             self.eat("NOT")
             operand = self.unary_expr()
-            return UnaryOp(op=op_token.value, operand=operand)
+            return UnaryOp(op=op_token.value, operand=operand, pos=op_token.pos)
         return self.factor()
 
     def factor(self):
-        # factor -> MINUS factor | NUMBER | BOOLEAN | LPAREN comparison RPAREN | STRING | IDENTIFIER ...
-        token = self.current_tolkien
-
-        if token.type == "MINUS":
+        # factor -> MINUS factor | primary (LBRACKET logical_expr RBRACKET)*
+        if self.current_tolkien.type == "MINUS":
+            pos = self.current_tolkien.pos
             self.eat("MINUS")
-            return UnaryOp(op="-", operand=self.factor())
+            return UnaryOp(op="-", operand=self.factor(), pos=pos)
+        return self.subscripts(self.primary())
+
+    def subscripts(self, node):
+        # Wrap node in an Index for each trailing [index]
+        while self.current_tolkien.type == "LBRACKET":
+            pos = self.current_tolkien.pos
+            self.eat("LBRACKET")
+            index = self.logical_expr()
+            self.eat("RBRACKET")
+            node = Index(node, index, pos=pos)
+        return node
 
-        elif token.type == "BOOLEAN":
+    def primary(self):
+        # primary -> NUMBER | BOOLEAN | LPAREN comparison RPAREN | STRING | array_literal | IDENTIFIER ...
+        token = self.current_tolkien
+
+        if token.type == "BOOLEAN":
             self.eat("BOOLEAN")
-            return Boolean(token.value)
+            return Boolean(token.value, pos=token.pos)
 
         elif token.type == "NUMBER":
             self.eat("NUMBER")
-            return Number(token.value)
+            return Number(token.value, pos=token.pos)
 
         elif token.type == "LPAREN":
             self.eat("LPAREN")
@@ -344,19 +399,61 @@ class Parser:
 
         elif token.type == "STRING":
             self.eat("STRING")
-            return String(token.value)
+            return String(token.value, pos=token.pos)
 
         elif token.type == "IDENTIFIER":
             return self.variable_reference()
 
+        elif token.type == "LBRACKET":
+            return self.array_literal()
+
+        elif token.type == "LBRACE":
+            return self.map_literal()
+
         else:
             self.error("NUMBER, BOOLEAN, MINUS or LPAREN")
 
+    def array_literal(self):
+        # array_literal -> LBRACKET (logical_expr (COMMA logical_expr)*)? RBRACKET
+        pos = self.current_tolkien.pos
+        self.eat("LBRACKET")
+        elements = []
+        if self.current_tolkien.type != "RBRACKET":
+            elements.append(self.logical_expr())
+            while self.current_tolkien.type == "COMMA":
+                self.eat("COMMA")
+                elements.append(self.logical_expr())
+        self.eat("RBRACKET")
+        return ArrayLiteral(elements, pos=pos)
+
+    def map_literal(self):
+        # map_literal -> LBRACE (map_entry (COMMA map_entry)*)? RBRACE
+        # map_entry -> logical_expr COLON logical_expr
+        pos = self.current_tolkien.pos
+        self.eat("LBRACE")
+        entries = []
+        if self.current_tolkien.type != "RBRACE":
+            entries.append(self.map_entry())
+            while self.current_tolkien.type == "COMMA":
+                self.eat("COMMA")
+                entries.append(self.map_entry())
+        self.eat("RBRACE")
+        return MapLiteral(entries, pos=pos)
+
+    def map_entry(self):
+        key = self.logical_expr()
+        self.eat("COLON")
+        return (key, self.logical_expr())
+
     def variable_reference(self):
-        # variable_reference -> IDENTIFIER
+        # variable_reference -> IDENTIFIER argument_list?
         var_name = self.current_tolkien.value
+        pos = self.current_tolkien.pos
         self.eat("IDENTIFIER")
-        return Var(var_name)
+        if self.current_tolkien.type == "LPAREN":
+            # A call used as a value, e.g. "x = abs(y);"
+            return FunctionCall(var_name, self.argument_list(), pos=pos)
+        return Var(var_name, pos=pos)
 
     # ---------------------------------
     #  Optional: parameter_list method